@@ -14,6 +14,7 @@ from app.schemas import (
     AIArbitrationResponse,
     BubbleData
 )
+from app.schemas._internal import BubbleDataDC, to_schema
 
 router = APIRouter(prefix="/ai", tags=["AI Integration Hooks"])
 
@@ -425,7 +426,7 @@ async def ai_bubble_detection(request: AIBubbleDetectionRequest):
     mock_bubbles = []
     for i, region in enumerate(request.image_regions):
         mock_bubbles.append(
-            BubbleData(
+            BubbleDataDC(
                 question_number=i + 1,
                 detected_answer="A",  # Mock answer
                 confidence=0.95,
@@ -438,7 +439,7 @@ async def ai_bubble_detection(request: AIBubbleDetectionRequest):
     
     return AIBubbleDetectionResponse(
         sheet_id=request.sheet_id,
-        bubbles=mock_bubbles,
+        bubbles=[to_schema(BubbleData, bubble) for bubble in mock_bubbles],
         confidence=0.95,
         processing_time_ms=processing_time
     )
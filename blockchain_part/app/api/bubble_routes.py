@@ -5,12 +5,13 @@ import uuid
 from datetime import datetime
 import random
 
-from app.database import get_db, SheetModel, BlockModel, EventModel
-from app.schemas import BubbleBlockCreate, BubbleBlockResponse
+from app.database import get_db, SheetModel, BlockModel, EventModel, select_partitioned
+from app.schemas import BubbleBlockCreate, BubbleBlockResponse, fast_response
 from app.blockchain import get_blockchain
 from app.services import get_audit_logger
 from app.services.omr_evaluator_service import get_omr_evaluator_service
 from app.utils.hashing import HashingEngine
+from app.utils.responses import PydanticResponse
 
 router = APIRouter(prefix="/bubble", tags=["Bubble Interpretation APIs"])
 
@@ -109,7 +110,8 @@ async def create_bubble_block(
             actor="ai_model"
         )
         
-        return BubbleBlockResponse(
+        return PydanticResponse(fast_response(
+            BubbleBlockResponse,
             success=True,
             sheet_id=request.sheet_id,
             block_index=block.index,
@@ -117,7 +119,7 @@ async def create_bubble_block(
             bubble_hash=bubble_hash,
             total_bubbles=len(bubble_list),
             created_at=block.timestamp
-        )
+        ))
     
     except HTTPException:
         raise
@@ -335,10 +337,11 @@ async def get_bubble_block(
         ).first()
         
         # Get event data
-        event = db.query(EventModel).filter(
-            EventModel.block_id == block.id,
-            EventModel.event_type == "bubble_interpretation"
-        ).first()
+        event = db.execute(select_partitioned(
+            db, EventModel,
+            block_id=block.id,
+            event_type="bubble_interpretation"
+        )).first()
         
         return {
             "success": True,
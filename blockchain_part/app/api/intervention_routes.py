@@ -139,7 +139,7 @@ async def resolve_intervention(
         
         return HumanInterventionResponse(
             success=True,
-            intervention_id=request.intervention_id,
+            intervention_id=intervention.intervention_id,
             sheet_id=intervention.sheet_id,
             intervention_type=intervention.intervention_type,
             status="resolved",
@@ -175,7 +175,11 @@ async def list_interventions(
         if intervention_type:
             query = query.filter(HumanInterventionModel.intervention_type == intervention_type)
         
-        interventions = query.order_by(HumanInterventionModel.created_at.desc()).all()
+        # id breaks ties between interventions created in the same second
+        interventions = query.order_by(
+            HumanInterventionModel.created_at.desc(),
+            HumanInterventionModel.id.desc()
+        ).all()
         
         # Count by status
         pending = sum(1 for i in interventions if i.status == "pending")
@@ -213,7 +217,7 @@ async def list_interventions(
 
 @router.get("/{intervention_id}", response_model=dict)
 async def get_intervention(
-    intervention_id: str,
+    intervention_id: uuid.UUID,
     db: Session = Depends(get_db)
 ):
     """
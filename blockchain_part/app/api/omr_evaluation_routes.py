@@ -10,7 +10,7 @@ from datetime import datetime
 import base64
 import uuid
 
-from app.database import get_db, SheetModel, BlockModel, EventModel
+from app.database import get_db, SheetModel, BlockModel, EventModel, select_partitioned
 from app.blockchain import get_blockchain
 from app.services import get_audit_logger
 from app.services.omr_evaluator_service import get_omr_evaluator_service
@@ -384,10 +384,11 @@ async def get_evaluation_status(
     """
     try:
         # Find evaluation event
-        event = db.query(EventModel).filter(
-            EventModel.sheet_id == sheet_id,
-            EventModel.event_type == "omr_evaluation"
-        ).order_by(EventModel.timestamp.desc()).first()
+        event = db.execute(select_partitioned(
+            db, EventModel,
+            sheet_id=sheet_id,
+            event_type="omr_evaluation"
+        )).first()
         
         if not event:
             return {
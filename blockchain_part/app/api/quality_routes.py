@@ -5,9 +5,9 @@ Handles OMR sheet quality assessment, damage detection, and reconstruction
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple
 import uuid
 from datetime import datetime
-import base64
 
 from app.database import (
     get_db,
@@ -29,10 +29,174 @@ from app.blockchain import get_blockchain
 from app.services.quality_service import QualityAssessmentService
 from app.services import get_audit_logger, get_s3_service
 from app.utils.hashing import HashingEngine
+from app.utils.encoding import b64decode
 
 router = APIRouter(prefix="/quality", tags=["Quality Assessment"])
 
 
+def _load_sheet_image(db: Session, request: QualityAssessmentRequest) -> Tuple[SheetModel, bytes]:
+    """Sheet to assess and its image, rejecting sheets already assessed"""
+    # Get sheet
+    sheet = db.query(SheetModel).filter(
+        SheetModel.sheet_id == request.sheet_id
+    ).first()
+    
+    if not sheet:
+        raise HTTPException(status_code=404, detail="Sheet not found")
+    
+    # Check if already assessed
+    existing = db.query(QualityAssessmentModel).filter(
+        QualityAssessmentModel.sheet_id == request.sheet_id
+    ).first()
+    
+    if existing:
+        raise HTTPException(status_code=400, detail="Quality assessment already performed")
+    
+    # Get image bytes
+    if request.image_data:
+        image_bytes = b64decode(request.image_data)
+    elif sheet.s3_url:
+        # Fetch from S3
+        s3_service = get_s3_service()
+        image_bytes = s3_service.download_file(sheet.s3_url)
+    else:
+        raise HTTPException(status_code=400, detail="No image data available")
+    
+    return sheet, image_bytes
+
+
+def _record_assessment(
+    db: Session,
+    request: QualityAssessmentRequest,
+    sheet: SheetModel,
+    approved: bool,
+    assessment_data: Dict[str, Any]
+) -> QualityAssessmentResponse:
+    """Create the assessment block, database records and audit log entry"""
+    # Generate assessment ID
+    assessment_id = f"QA_{sheet.sheet_id}_{int(datetime.utcnow().timestamp())}"
+    
+    # Calculate assessment hash
+    assessment_hash = HashingEngine.hash_dict(assessment_data)
+    
+    # Create blockchain block
+    blockchain = get_blockchain()
+    block_data = {
+        "assessment_id": assessment_id,
+        "sheet_id": request.sheet_id,
+        "quality_score": assessment_data.get("overall_quality_score", 0.0),
+        "has_damage": assessment_data.get("has_damage", False),
+        "approved_for_evaluation": approved,
+        "requires_reconstruction": assessment_data.get("requires_reconstruction", False),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    
+    block = blockchain.create_block(
+        block_type="quality_assessment",
+        data=block_data,
+        mine=True
+    )
+    
+    # Save block
+    block_record = BlockModel(
+        block_index=block.index,
+        timestamp=datetime.fromisoformat(block.timestamp),
+        block_type=block.block_type,
+        data_hash=assessment_hash,
+        previous_hash=block.previous_hash,
+        block_hash=block.hash,
+        merkle_root=block.merkle_root,
+        nonce=block.nonce
+    )
+    db.add(block_record)
+    db.flush()
+    
+    # Save quality assessment
+    quality_assessment = QualityAssessmentModel(
+        assessment_id=assessment_id,
+        sheet_id=request.sheet_id,
+        has_damage=assessment_data.get("has_damage", False),
+        damage_types=assessment_data.get("damage_types", []),
+        damage_severity=assessment_data.get("damage_severity"),
+        damage_regions=assessment_data.get("damage_regions", []),
+        overall_quality_score=assessment_data.get("overall_quality_score", 0.0),
+        bubble_clarity_score=assessment_data.get("bubble_clarity_score", 0.0),
+        sheet_alignment_score=assessment_data.get("sheet_alignment_score", 0.0),
+        is_recoverable=assessment_data.get("is_recoverable", True),
+        requires_reconstruction=assessment_data.get("requires_reconstruction", False),
+        reconstruction_confidence=assessment_data.get("reconstruction_confidence"),
+        assessment_model=request.assessment_model,
+        approved_for_evaluation=approved,
+        flagged_for_review=assessment_data.get("flagged_for_review", False),
+        flag_reason=assessment_data.get("flag_reason"),
+        requires_human_intervention=assessment_data.get("requires_human_intervention", False),
+        assessment_block_id=block_record.id,
+        assessment_hash=assessment_hash
+    )
+    db.add(quality_assessment)
+    
+    # Update sheet status
+    sheet.status = "quality_assessed"
+    sheet.updated_at = datetime.utcnow()
+    
+    # Create event
+    event = EventModel(
+        event_id=str(uuid.uuid4()),
+        event_type="quality_assessment",
+        sheet_id=request.sheet_id,
+        block_id=block_record.id,
+        event_data=block_data,
+        event_hash=assessment_hash,
+        triggered_by="ai_model"
+    )
+    db.add(event)
+    
+    # Create human intervention if needed
+    if assessment_data.get("requires_human_intervention", False):
+        intervention = HumanInterventionModel(
+            intervention_id=str(uuid.uuid4()),
+            sheet_id=request.sheet_id,
+            intervention_type="quality_review",
+            pipeline_stage="quality_assessment",
+            reason=assessment_data.get("flag_reason", "Quality assessment flagged for review"),
+            details=assessment_data,
+            priority="high" if not assessment_data.get("is_recoverable", True) else "medium",
+            status="pending"
+        )
+        db.add(intervention)
+    
+    db.commit()
+    
+    # Audit log
+    audit_logger = get_audit_logger()
+    audit_logger.append_log(
+        sheet_id=request.sheet_id,
+        event_type="quality_assessment_completed",
+        event_data=block_data,
+        blockchain_hash=block.hash,
+        actor="ai_model"
+    )
+    
+    return QualityAssessmentResponse(
+        success=True,
+        assessment_id=assessment_id,
+        sheet_id=request.sheet_id,
+        has_damage=assessment_data.get("has_damage", False),
+        damage_severity=assessment_data.get("damage_severity"),
+        overall_quality_score=assessment_data.get("overall_quality_score", 0.0),
+        is_recoverable=assessment_data.get("is_recoverable", True),
+        requires_reconstruction=assessment_data.get("requires_reconstruction", False),
+        approved_for_evaluation=approved,
+        flagged_for_review=assessment_data.get("flagged_for_review", False),
+        flag_reason=assessment_data.get("flag_reason"),
+        requires_human_intervention=assessment_data.get("requires_human_intervention", False),
+        block_index=block.index,
+        block_hash=block.hash,
+        assessment_hash=assessment_hash,
+        message="Quality assessment completed"
+    )
+
+
 @router.post("/assess", response_model=QualityAssessmentResponse)
 async def assess_omr_quality(
     request: QualityAssessmentRequest,
@@ -47,158 +211,60 @@ async def assess_omr_quality(
     - Flags for human review if needed
     """
     try:
-        # Get sheet
-        sheet = db.query(SheetModel).filter(
-            SheetModel.sheet_id == request.sheet_id
-        ).first()
-        
-        if not sheet:
-            raise HTTPException(status_code=404, detail="Sheet not found")
-        
-        # Check if already assessed
-        existing = db.query(QualityAssessmentModel).filter(
-            QualityAssessmentModel.sheet_id == request.sheet_id
-        ).first()
-        
-        if existing:
-            raise HTTPException(status_code=400, detail="Quality assessment already performed")
-        
-        # Get image bytes
-        if request.image_data:
-            image_bytes = base64.b64decode(request.image_data)
-        elif sheet.s3_url:
-            # Fetch from S3
-            s3_service = get_s3_service()
-            image_bytes = s3_service.download_file(sheet.s3_url)
-        else:
-            raise HTTPException(status_code=400, detail="No image data available")
+        sheet, image_bytes = _load_sheet_image(db, request)
         
         # Perform quality assessment
         quality_service = QualityAssessmentService(model_id=request.assessment_model)
         approved, assessment_data = quality_service.assess_quality(image_bytes)
         
-        # Generate assessment ID
-        assessment_id = f"QA_{sheet.sheet_id}_{int(datetime.utcnow().timestamp())}"
-        
-        # Calculate assessment hash
-        assessment_hash = HashingEngine.hash_dict(assessment_data)
-        
-        # Create blockchain block
-        blockchain = get_blockchain()
-        block_data = {
-            "assessment_id": assessment_id,
-            "sheet_id": request.sheet_id,
-            "quality_score": assessment_data.get("overall_quality_score", 0.0),
-            "has_damage": assessment_data.get("has_damage", False),
-            "approved_for_evaluation": approved,
-            "requires_reconstruction": assessment_data.get("requires_reconstruction", False),
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-        block = blockchain.create_block(
-            block_type="quality_assessment",
-            data=block_data,
-            mine=True
-        )
-        
-        # Save block
-        block_record = BlockModel(
-            block_index=block.index,
-            timestamp=datetime.fromisoformat(block.timestamp),
-            block_type=block.block_type,
-            data_hash=assessment_hash,
-            previous_hash=block.previous_hash,
-            block_hash=block.hash,
-            merkle_root=block.merkle_root,
-            nonce=block.nonce
-        )
-        db.add(block_record)
-        db.flush()
+        return _record_assessment(db, request, sheet, approved, assessment_data)
         
-        # Save quality assessment
-        quality_assessment = QualityAssessmentModel(
-            assessment_id=assessment_id,
-            sheet_id=request.sheet_id,
-            has_damage=assessment_data.get("has_damage", False),
-            damage_types=assessment_data.get("damage_types", []),
-            damage_severity=assessment_data.get("damage_severity"),
-            damage_regions=assessment_data.get("damage_regions", []),
-            overall_quality_score=assessment_data.get("overall_quality_score", 0.0),
-            bubble_clarity_score=assessment_data.get("bubble_clarity_score", 0.0),
-            sheet_alignment_score=assessment_data.get("sheet_alignment_score", 0.0),
-            is_recoverable=assessment_data.get("is_recoverable", True),
-            requires_reconstruction=assessment_data.get("requires_reconstruction", False),
-            reconstruction_confidence=assessment_data.get("reconstruction_confidence"),
-            assessment_model=request.assessment_model,
-            approved_for_evaluation=approved,
-            flagged_for_review=assessment_data.get("flagged_for_review", False),
-            flag_reason=assessment_data.get("flag_reason"),
-            requires_human_intervention=assessment_data.get("requires_human_intervention", False),
-            assessment_block_id=block_record.id,
-            assessment_hash=assessment_hash
-        )
-        db.add(quality_assessment)
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/assess-batch", response_model=List[QualityAssessmentResponse])
+async def assess_omr_quality_batch(
+    batch: List[QualityAssessmentRequest],
+    db: Session = Depends(get_db)
+):
+    """
+    Assess a burst of OMR sheets at once
+    
+    - Checks every sheet first; one bad sheet rejects the whole batch
+    - Runs the damage detection for the sheets concurrently, once per
+      distinct image
+    - Records each assessment as /assess does, in request order
+    """
+    try:
+        if not batch:
+            raise HTTPException(status_code=400, detail="Batch cannot be empty")
         
-        # Update sheet status
-        sheet.status = "quality_assessed"
-        sheet.updated_at = datetime.utcnow()
+        sheet_ids = [request.sheet_id for request in batch]
+        if len(set(sheet_ids)) != len(sheet_ids):
+            raise HTTPException(status_code=400, detail="Duplicate sheet_id in batch")
         
-        # Create event
-        event = EventModel(
-            event_id=str(uuid.uuid4()),
-            event_type="quality_assessment",
-            sheet_id=request.sheet_id,
-            block_id=block_record.id,
-            event_data=block_data,
-            event_hash=assessment_hash,
-            triggered_by="ai_model"
-        )
-        db.add(event)
-        
-        # Create human intervention if needed
-        if assessment_data.get("requires_human_intervention", False):
-            intervention = HumanInterventionModel(
-                intervention_id=str(uuid.uuid4()),
-                sheet_id=request.sheet_id,
-                intervention_type="quality_review",
-                pipeline_stage="quality_assessment",
-                reason=assessment_data.get("flag_reason", "Quality assessment flagged for review"),
-                details=assessment_data,
-                priority="high" if not assessment_data.get("is_recoverable", True) else "medium",
-                status="pending"
-            )
-            db.add(intervention)
+        loaded = [_load_sheet_image(db, request) for request in batch]
         
-        db.commit()
+        # One service (and one concurrent batch) per requested model
+        by_model: Dict[str, List[int]] = {}
+        for i, request in enumerate(batch):
+            by_model.setdefault(request.assessment_model, []).append(i)
         
-        # Audit log
-        audit_logger = get_audit_logger()
-        audit_logger.append_log(
-            sheet_id=request.sheet_id,
-            event_type="quality_assessment_completed",
-            event_data=block_data,
-            blockchain_hash=block.hash,
-            actor="ai_model"
-        )
+        assessments: List[Optional[Tuple[bool, Dict[str, Any]]]] = [None] * len(batch)
+        for model, indexes in by_model.items():
+            quality_service = QualityAssessmentService(model_id=model)
+            results = await quality_service.assess_quality_batch([loaded[i][1] for i in indexes])
+            for i, result in zip(indexes, results):
+                assessments[i] = result
         
-        return QualityAssessmentResponse(
-            success=True,
-            assessment_id=assessment_id,
-            sheet_id=request.sheet_id,
-            has_damage=assessment_data.get("has_damage", False),
-            damage_severity=assessment_data.get("damage_severity"),
-            overall_quality_score=assessment_data.get("overall_quality_score", 0.0),
-            is_recoverable=assessment_data.get("is_recoverable", True),
-            requires_reconstruction=assessment_data.get("requires_reconstruction", False),
-            approved_for_evaluation=approved,
-            flagged_for_review=assessment_data.get("flagged_for_review", False),
-            flag_reason=assessment_data.get("flag_reason"),
-            requires_human_intervention=assessment_data.get("requires_human_intervention", False),
-            block_index=block.index,
-            block_hash=block.hash,
-            assessment_hash=assessment_hash,
-            message="Quality assessment completed"
-        )
+        return [
+            _record_assessment(db, request, sheet, approved, assessment_data)
+            for request, (sheet, _), (approved, assessment_data) in zip(batch, loaded, assessments)
+        ]
         
     except HTTPException:
         raise
@@ -260,7 +326,7 @@ async def reconstruct_omr_sheet(
         # Upload reconstructed image
         reconstructed_s3_url = None
         if recon_data.get("reconstructed_image_base64"):
-            reconstructed_bytes = base64.b64decode(recon_data["reconstructed_image_base64"])
+            reconstructed_bytes = b64decode(recon_data["reconstructed_image_base64"])
             s3_service = get_s3_service()
             storage_result = s3_service.upload_file(
                 file_content=reconstructed_bytes,
@@ -6,7 +6,6 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 import uuid
 from datetime import datetime
-import base64
 
 from app.database import (
     get_db, 
@@ -15,6 +14,7 @@ from app.database import (
     BlockModel,
     EventModel
 )
+from app.schemas import fast_response
 from app.schemas.extended_schemas import (
     QuestionPaperUpload,
     QuestionPaperResponse,
@@ -28,6 +28,8 @@ from app.blockchain import get_blockchain
 from app.services.answer_key_service import AnswerKeyService
 from app.services import get_audit_logger, get_s3_service
 from app.utils.hashing import HashingEngine
+from app.utils.encoding import b64decode
+from app.utils.responses import PydanticResponse
 
 router = APIRouter(prefix="/question-paper", tags=["Question Paper & Answer Key Management"])
 
@@ -56,7 +58,7 @@ async def upload_question_paper(
         # Upload file if provided
         s3_url = None
         if request.file_content:
-            file_bytes = base64.b64decode(request.file_content)
+            file_bytes = b64decode(request.file_content)
             
             # Verify hash
             actual_hash = HashingEngine.hash_file(file_bytes)
@@ -203,7 +205,10 @@ async def upload_answer_key(
             raise HTTPException(status_code=400, detail="Answer key already exists")
         
         # Validate answer key format
-        is_valid, errors = AnswerKeyService.validate_answer_key_format(request.answers)
+        is_valid, errors = AnswerKeyService.validate_answer_key_format(
+            request.answers,
+            paper_id=request.paper_id
+        )
         if not is_valid:
             raise HTTPException(status_code=400, detail=f"Invalid answer key format: {', '.join(errors)}")
         
@@ -333,19 +338,20 @@ async def verify_answer_key_with_ai(
         
         db.commit()
         
-        return AIKeyVerificationResponse(
+        return PydanticResponse(fast_response(
+            AIKeyVerificationResponse,
             success=True,
             key_id=request.key_id,
             ai_verified=ai_verified,
             verification_status=verification_result["verification_status"],
             ai_confidence=verification_result["ai_confidence"],
-            flagged_questions=verification_result["flagged_questions"],
+            flagged_questions=list(verification_result["flagged_questions"]),
             flag_reasons=verification_result["flag_reasons"],
             verification_details=verification_result,
             block_index=block_index,
             block_hash=block_hash,
             message="AI verification completed" + (" with flags" if not ai_verified else "")
-        )
+        ))
         
     except HTTPException:
         raise
@@ -382,7 +388,11 @@ async def approve_answer_key_human(
                 request.corrections
             )
             answer_key.answers = corrected_answers
-            answer_key.key_hash = AnswerKeyService.create_key_hash(corrected_answers)
+            answer_key.key_hash = AnswerKeyService.create_key_hash(
+                corrected_answers,
+                base_hash=answer_key.key_hash,
+                changed_keys=request.corrections.keys()
+            )
         
         # Update verification status
         answer_key.human_verified = True
@@ -4,10 +4,11 @@ import uuid
 from datetime import datetime
 
 from app.database import get_db, SheetModel, BlockModel, RecheckRequestModel
-from app.schemas import RecheckRequest, RecheckResponse, RecheckResultResponse
+from app.schemas import RecheckRequest, RecheckResponse, RecheckResultResponse, fast_response
 from app.blockchain import get_blockchain
 from app.services import get_audit_logger
 from app.utils.hashing import HashingEngine
+from app.utils.responses import PydanticResponse
 
 router = APIRouter(prefix="/recheck", tags=["Revaluation APIs"])
 
@@ -100,7 +101,8 @@ async def create_recheck_request(
             actor=request.requested_by
         )
         
-        return RecheckResponse(
+        return PydanticResponse(fast_response(
+            RecheckResponse,
             success=True,
             request_id=request_id,
             sheet_id=request.sheet_id,
@@ -109,7 +111,7 @@ async def create_recheck_request(
             block_hash=block.hash,
             created_at=block.timestamp,
             message="Recheck request created successfully"
-        )
+        ))
     
     except HTTPException:
         raise
@@ -180,7 +182,7 @@ async def get_recheck_requests(
 
 @router.get("/request/{request_id}", response_model=RecheckResultResponse)
 async def get_recheck_result(
-    request_id: str,
+    request_id: uuid.UUID,
     db: Session = Depends(get_db)
 ):
     """
@@ -200,16 +202,17 @@ async def get_recheck_result(
                 detail="Recheck request is still pending"
             )
         
-        return RecheckResultResponse(
+        return PydanticResponse(fast_response(
+            RecheckResultResponse,
             success=True,
-            request_id=request_id,
+            request_id=recheck.request_id,
             sheet_id=recheck.sheet_id,
             original_result=recheck.original_result or {},
             rechecked_result=recheck.rechecked_result or {},
             changes_found=recheck.changes_found or [],
             status=recheck.status,
             processed_at=recheck.processed_at.isoformat() if recheck.processed_at else ""
-        )
+        ))
     
     except HTTPException:
         raise
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, bindparam
 from sqlalchemy.orm import Session
 import uuid
 from datetime import datetime
@@ -6,14 +7,20 @@ import qrcode
 import base64
 from io import BytesIO
 
-from app.database import get_db, SheetModel, BlockModel, ResultModel
-from app.schemas import ResultCommitRequest, ResultCommitResponse, ResultQueryResponse
+from app.database import get_db, SheetModel, BlockModel, ResultModel, ResultBlobModel
+from app.schemas import ResultCommitRequest, ResultCommitResponse, ResultQueryResponse, fast_response
 from app.blockchain import get_blockchain
 from app.services import get_audit_logger, get_zkp_engine
 from app.utils.hashing import HashingEngine
+from app.utils.responses import PydanticResponse
 
 router = APIRouter(prefix="/result", tags=["Final Result APIs"])
 
+# Built once so repeated lookups hit SQLAlchemy's compiled statement cache
+_RESULT_BY_ROLL = select(ResultModel).where(
+    ResultModel.roll_number == bindparam("roll_number")
+).limit(1)
+
 
 @router.post("/commit", response_model=ResultCommitResponse)
 async def commit_result(
@@ -55,7 +62,7 @@ async def commit_result(
             )
         
         # Prepare result data
-        answers_list = [ans.dict() for ans in request.answers]
+        answers_list = request.answers
         
         result_data = {
             "sheet_id": request.sheet_id,
@@ -159,10 +166,10 @@ async def commit_result(
             is_verified=True,
             verified_by=[sig.dict() for sig in request.signatures],
             verification_timestamp=datetime.utcnow(),
-            qr_code_data=qr_code_base64,
             published_at=datetime.utcnow()
         )
         db.add(result_record)
+        db.add(ResultBlobModel(result_id=result_id, qr_code=qr_code_base64))
         
         db.commit()
         
@@ -176,7 +183,8 @@ async def commit_result(
             actor="system"
         )
         
-        return ResultCommitResponse(
+        return PydanticResponse(fast_response(
+            ResultCommitResponse,
             success=True,
             sheet_id=request.sheet_id,
             roll_number=request.roll_number,
@@ -189,7 +197,7 @@ async def commit_result(
             is_verified=True,
             created_at=block.timestamp,
             message="Result committed successfully"
-        )
+        ))
     
     except HTTPException:
         raise
@@ -212,9 +220,9 @@ async def get_result(
     - Includes audit trail
     """
     try:
-        result = db.query(ResultModel).filter(
-            ResultModel.roll_number == roll_number
-        ).first()
+        result = db.execute(
+            _RESULT_BY_ROLL, {"roll_number": roll_number}
+        ).scalars().first()
         
         if not result:
             raise HTTPException(status_code=404, detail="Result not found")
@@ -234,11 +242,15 @@ async def get_result(
             block.block_index
         ) if block else {}
         
+        # QR code lives in the sidecar blob table
+        blob = db.get(ResultBlobModel, result.result_id)
+        
         # Get audit trail
         audit_logger = get_audit_logger()
         audit_trail = audit_logger.get_sheet_timeline(result.sheet_id)
         
-        return ResultQueryResponse(
+        return PydanticResponse(fast_response(
+            ResultQueryResponse,
             success=True,
             roll_number=roll_number,
             result_data={
@@ -252,7 +264,7 @@ async def get_result(
                 "percentage": result.percentage,
                 "grade": result.grade,
                 "answer_sheet": result.answer_sheet,
-                "qr_code": result.qr_code_data,
+                "qr_code": blob.qr_code if blob else None,
                 "published_at": result.published_at.isoformat() if result.published_at else None
             },
             blockchain_proof=blockchain_proof,
@@ -264,7 +276,7 @@ async def get_result(
                 "result_hash": result.result_hash
             },
             audit_trail=audit_trail[-10:]  # Last 10 events
-        )
+        ))
     
     except HTTPException:
         raise
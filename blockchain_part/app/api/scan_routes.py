@@ -1,19 +1,124 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, File, Form, UploadFile
 from sqlalchemy.orm import Session
-from typing import Optional
-import base64
+from typing import List, Optional
 
 from app.database import get_db, SheetModel, BlockModel, EventModel
-from app.schemas import ScanBlockCreate, ScanBlockResponse, ErrorResponse
+from app.schemas import ScanBlockCreate, ScanBlockResponse, ErrorResponse, fast_response
+from app.schemas._adapters import SCAN_BATCH_RESPONSE_ADAPTER, SCAN_RESPONSE_ADAPTER
 from app.blockchain import get_blockchain
 from app.services import get_s3_service, get_audit_logger
 from app.utils.hashing import HashingEngine
+from app.utils.encoding import b64decode
+from app.utils.responses import PydanticResponse
 from datetime import datetime
 import uuid
 
 router = APIRouter(prefix="/scan", tags=["Scan Block APIs"])
 
 
+def _ensure_new_sheet(db: Session, sheet_id: str) -> None:
+    """Reject a scan for a sheet that already exists"""
+    existing_sheet = db.query(SheetModel).filter(
+        SheetModel.sheet_id == sheet_id
+    ).first()
+    
+    if existing_sheet:
+        raise HTTPException(status_code=400, detail="Sheet already exists")
+
+
+def _record_scan_block(
+    request: ScanBlockCreate,
+    db: Session,
+    storage_result: Optional[dict]
+) -> ScanBlockResponse:
+    """Create the scan block, its database records and audit log entry"""
+    # Create blockchain block
+    blockchain = get_blockchain()
+    
+    block_data = {
+        "sheet_id": request.sheet_id,
+        "roll_number": request.roll_number,
+        "exam_id": request.exam_id,
+        "student_name": request.student_name,
+        "file_hash": request.file_hash,
+        "metadata": request.metadata,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    
+    scan_hash = HashingEngine.hash_dict(block_data)
+    
+    block = blockchain.create_block(
+        block_type="scan",
+        data=block_data,
+        mine=True
+    )
+    
+    # Save to database
+    # Save block
+    block_record = BlockModel(
+        block_index=block.index,
+        timestamp=datetime.fromisoformat(block.timestamp),
+        block_type=block.block_type,
+        data_hash=scan_hash,
+        previous_hash=block.previous_hash,
+        block_hash=block.hash,
+        merkle_root=block.merkle_root,
+        nonce=block.nonce
+    )
+    db.add(block_record)
+    db.flush()
+    
+    # Save sheet
+    sheet_record = SheetModel(
+        sheet_id=request.sheet_id,
+        roll_number=request.roll_number,
+        exam_id=request.exam_id,
+        student_name=request.student_name,
+        original_file_hash=request.file_hash,
+        s3_url=storage_result.get("s3_url") if storage_result else None,
+        status="scanned",
+        scan_hash=scan_hash,
+        scan_block_id=block_record.id
+    )
+    db.add(sheet_record)
+    
+    # Save event
+    event_record = EventModel(
+        event_id=str(uuid.uuid4()),
+        event_type="scan_created",
+        sheet_id=request.sheet_id,
+        block_id=block_record.id,
+        event_data=block_data,
+        event_hash=scan_hash,
+        triggered_by="system"
+    )
+    db.add(event_record)
+    
+    db.commit()
+    
+    # Create audit log
+    audit_logger = get_audit_logger()
+    audit_logger.append_log(
+        sheet_id=request.sheet_id,
+        event_type="scan_block_created",
+        event_data=block_data,
+        blockchain_hash=block.hash,
+        actor="system"
+    )
+    
+    return fast_response(
+        ScanBlockResponse,
+        success=True,
+        sheet_id=request.sheet_id,
+        block_index=block.index,
+        block_hash=block.hash,
+        scan_hash=scan_hash,
+        s3_url=storage_result.get("s3_url") if storage_result else None,
+        created_at=block.timestamp,
+        message="Scan block created successfully"
+    )
+
+
 @router.post("/create", response_model=ScanBlockResponse)
 async def create_scan_block(
     request: ScanBlockCreate,
@@ -29,12 +134,7 @@ async def create_scan_block(
     """
     try:
         # Check if sheet already exists
-        existing_sheet = db.query(SheetModel).filter(
-            SheetModel.sheet_id == request.sheet_id
-        ).first()
-        
-        if existing_sheet:
-            raise HTTPException(status_code=400, detail="Sheet already exists")
+        _ensure_new_sheet(db, request.sheet_id)
         
         # Upload file to storage
         s3_service = get_s3_service()
@@ -42,7 +142,7 @@ async def create_scan_block(
         
         if request.file_content:
             # Decode base64 file content
-            file_bytes = base64.b64decode(request.file_content)
+            file_bytes = b64decode(request.file_content)
             
             # Verify hash
             actual_hash = HashingEngine.hash_file(file_bytes)
@@ -64,90 +164,128 @@ async def create_scan_block(
                 }
             )
         
-        # Create blockchain block
-        blockchain = get_blockchain()
-        
-        block_data = {
-            "sheet_id": request.sheet_id,
-            "roll_number": request.roll_number,
-            "exam_id": request.exam_id,
-            "student_name": request.student_name,
-            "file_hash": request.file_hash,
-            "metadata": request.metadata,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-        scan_hash = HashingEngine.hash_dict(block_data)
+        return PydanticResponse(_record_scan_block(request, db, storage_result), adapter=SCAN_RESPONSE_ADAPTER)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/upload", response_model=ScanBlockResponse)
+async def upload_scan_block(
+    file: UploadFile = File(...),
+    sheet_id: str = Form(...),
+    roll_number: str = Form(...),
+    exam_id: str = Form(...),
+    file_hash: str = Form(...),
+    student_name: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Create a scan block from a multipart file upload
+    
+    Same as /create, but the sheet arrives as a file part instead of
+    base64 JSON and is streamed to S3 (or local storage) without being
+    read into memory.
+    """
+    request = ScanBlockCreate(
+        sheet_id=sheet_id,
+        roll_number=roll_number,
+        exam_id=exam_id,
+        student_name=student_name,
+        file_hash=file_hash
+    )
+    
+    try:
+        # Check if sheet already exists
+        _ensure_new_sheet(db, request.sheet_id)
         
-        block = blockchain.create_block(
-            block_type="scan",
-            data=block_data,
-            mine=True
-        )
+        # Stream the file to storage; nothing is stored on a hash mismatch
+        s3_service = get_s3_service()
+        try:
+            storage_result = s3_service.upload_stream(
+                file.file,
+                file_name=f"{request.sheet_id}.jpg",
+                content_type="image/jpeg",
+                metadata={
+                    "sheet_id": request.sheet_id,
+                    "roll_number": request.roll_number,
+                    "exam_id": request.exam_id
+                },
+                expected_hash=request.file_hash
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        # Save to database
-        # Save block
-        block_record = BlockModel(
-            block_index=block.index,
-            timestamp=datetime.fromisoformat(block.timestamp),
-            block_type=block.block_type,
-            data_hash=scan_hash,
-            previous_hash=block.previous_hash,
-            block_hash=block.hash,
-            merkle_root=block.merkle_root,
-            nonce=block.nonce
-        )
-        db.add(block_record)
-        db.flush()
+        return PydanticResponse(_record_scan_block(request, db, storage_result), adapter=SCAN_RESPONSE_ADAPTER)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch", response_model=List[ScanBlockResponse])
+async def create_scan_blocks(
+    batch: List[ScanBlockCreate],
+    db: Session = Depends(get_db)
+):
+    """
+    Create scan blocks for several OMR sheets at once
+    
+    - Checks every sheet first; one bad sheet rejects the whole batch
+    - Uploads the files concurrently
+    - Creates the blockchain blocks in request order
+    """
+    try:
+        if not batch:
+            raise HTTPException(status_code=400, detail="Batch cannot be empty")
         
-        # Save sheet
-        sheet_record = SheetModel(
-            sheet_id=request.sheet_id,
-            roll_number=request.roll_number,
-            exam_id=request.exam_id,
-            student_name=request.student_name,
-            original_file_hash=request.file_hash,
-            s3_url=storage_result.get("s3_url") if storage_result else None,
-            status="scanned",
-            scan_hash=scan_hash,
-            scan_block_id=block_record.id
-        )
-        db.add(sheet_record)
+        sheet_ids = [request.sheet_id for request in batch]
+        if len(set(sheet_ids)) != len(sheet_ids):
+            raise HTTPException(status_code=400, detail="Duplicate sheet_id in batch")
         
-        # Save event
-        event_record = EventModel(
-            event_id=str(uuid.uuid4()),
-            event_type="scan_created",
-            sheet_id=request.sheet_id,
-            block_id=block_record.id,
-            event_data=block_data,
-            event_hash=scan_hash,
-            triggered_by="system"
-        )
-        db.add(event_record)
+        if db.query(SheetModel.sheet_id).filter(SheetModel.sheet_id.in_(sheet_ids)).first():
+            raise HTTPException(status_code=400, detail="Sheet already exists")
         
-        db.commit()
+        # Decode and verify every file before anything is uploaded
+        uploads = []
+        for request in batch:
+            if not request.file_content:
+                continue
+            
+            file_bytes = b64decode(request.file_content)
+            if HashingEngine.hash_file(file_bytes) != request.file_hash:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"File hash mismatch for sheet {request.sheet_id}"
+                )
+            
+            uploads.append((request.sheet_id, {
+                "file_content": file_bytes,
+                "file_name": f"{request.sheet_id}.jpg",
+                "content_type": "image/jpeg",
+                "metadata": {
+                    "sheet_id": request.sheet_id,
+                    "roll_number": request.roll_number,
+                    "exam_id": request.exam_id
+                }
+            }))
         
-        # Create audit log
-        audit_logger = get_audit_logger()
-        audit_logger.append_log(
-            sheet_id=request.sheet_id,
-            event_type="scan_block_created",
-            event_data=block_data,
-            blockchain_hash=block.hash,
-            actor="system"
-        )
+        s3_service = get_s3_service()
+        storage_results = dict(zip(
+            [sheet_id for sheet_id, _ in uploads],
+            s3_service.upload_many([upload for _, upload in uploads])
+        ))
         
-        return ScanBlockResponse(
-            success=True,
-            sheet_id=request.sheet_id,
-            block_index=block.index,
-            block_hash=block.hash,
-            scan_hash=scan_hash,
-            s3_url=storage_result.get("s3_url") if storage_result else None,
-            created_at=block.timestamp,
-            message="Scan block created successfully"
-        )
+        responses = [
+            _record_scan_block(request, db, storage_results.get(request.sheet_id))
+            for request in batch
+        ]
+        return PydanticResponse(responses, adapter=SCAN_BATCH_RESPONSE_ADAPTER)
     
     except HTTPException:
         raise
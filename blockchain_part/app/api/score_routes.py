@@ -3,11 +3,12 @@ from sqlalchemy.orm import Session
 import uuid
 from datetime import datetime
 
-from app.database import get_db, SheetModel, BlockModel, EventModel
-from app.schemas import AIScoreBlockCreate, AIScoreBlockResponse
+from app.database import get_db, SheetModel, BlockModel, EventModel, select_partitioned
+from app.schemas import AIScoreBlockCreate, AIScoreBlockResponse, fast_response
 from app.blockchain import get_blockchain
 from app.services import get_audit_logger
 from app.utils.hashing import HashingEngine
+from app.utils.responses import PydanticResponse
 
 router = APIRouter(prefix="/score", tags=["AI Scoring APIs"])
 
@@ -105,7 +106,8 @@ async def create_score_block(
             actor=request.model_name
         )
         
-        return AIScoreBlockResponse(
+        return PydanticResponse(fast_response(
+            AIScoreBlockResponse,
             success=True,
             sheet_id=request.sheet_id,
             block_index=block.index,
@@ -114,7 +116,7 @@ async def create_score_block(
             model_name=request.model_name,
             total_predictions=len(predictions_list),
             created_at=block.timestamp
-        )
+        ))
     
     except HTTPException:
         raise
@@ -139,11 +141,13 @@ async def get_score_block(
         if not sheet:
             raise HTTPException(status_code=404, detail="Sheet not found")
         
-        # Get all scoring events
-        events = db.query(EventModel).filter(
-            EventModel.sheet_id == sheet_id,
-            EventModel.event_type == "ai_scoring"
-        ).all()
+        # Get all scoring events, oldest first
+        events = db.execute(select_partitioned(
+            db, EventModel,
+            newest_first=False,
+            sheet_id=sheet_id,
+            event_type="ai_scoring"
+        )).all()
         
         if not events:
             raise HTTPException(
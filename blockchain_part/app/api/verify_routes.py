@@ -3,8 +3,8 @@ from sqlalchemy.orm import Session
 import uuid
 from datetime import datetime
 
-from app.database import get_db, SheetModel, BlockModel, EventModel, SignatureModel
-from app.schemas import VerificationBlockCreate, VerificationBlockResponse
+from app.database import get_db, SheetModel, BlockModel, EventModel, SignatureModel, AuditBuffer
+from app.schemas import VerificationBlockCreate, VerificationBlockResponse, fast_response
 from app.blockchain import get_blockchain
 from app.services import (
     get_audit_logger,
@@ -13,6 +13,7 @@ from app.services import (
     SignatureValidator
 )
 from app.utils.hashing import HashingEngine
+from app.utils.responses import PydanticResponse
 
 router = APIRouter(prefix="/verify", tags=["Verification APIs"])
 
@@ -41,6 +42,12 @@ async def create_verification_block(
         # Initialize multi-signature engine
         sig_engine = MultiSignatureEngine()
         
+        # Signature and event rows are written in one batch per transaction
+        audit_buffer = AuditBuffer(db)
+        
+        # Every signer signs the same payload, so it is hashed once
+        verification_data_hash = HashingEngine.hash_dict(request.verification_data)
+        
         # Process signatures
         signatures_data = []
         for sig_data in request.signatures:
@@ -49,12 +56,14 @@ async def create_verification_block(
                 signature = sig_engine.add_signature(
                     signer_type=signer_type,
                     signer_key=sig_data.signer_key,
-                    signed_data=request.verification_data
+                    signed_data=request.verification_data,
+                    signed_data_hash=verification_data_hash
                 )
                 signatures_data.append(signature.to_dict())
                 
                 # Save signature to database
-                sig_record = SignatureModel(
+                audit_buffer.add(
+                    SignatureModel,
                     signature_id=signature.signature_id,
                     sheet_id=request.sheet_id,
                     signer_type=sig_data.signer_type,
@@ -64,7 +73,6 @@ async def create_verification_block(
                     status="approved",
                     signed_at=datetime.utcnow()
                 )
-                db.add(sig_record)
             
             except ValueError as e:
                 raise HTTPException(status_code=400, detail=str(e))
@@ -85,7 +93,7 @@ async def create_verification_block(
             
             verify_hash = HashingEngine.hash_dict(block_data)
             
-            db.commit()
+            audit_buffer.commit()
             
             raise HTTPException(
                 status_code=400,
@@ -136,7 +144,8 @@ async def create_verification_block(
         sheet.updated_at = datetime.utcnow()
         
         # Save event
-        event_record = EventModel(
+        audit_buffer.add(
+            EventModel,
             event_id=str(uuid.uuid4()),
             event_type="verification",
             sheet_id=request.sheet_id,
@@ -145,9 +154,8 @@ async def create_verification_block(
             event_hash=verify_hash,
             triggered_by="multi_signature"
         )
-        db.add(event_record)
         
-        db.commit()
+        audit_buffer.commit()
         
         # Audit log
         audit_logger = get_audit_logger()
@@ -159,7 +167,8 @@ async def create_verification_block(
             actor="multi_signature_system"
         )
         
-        return VerificationBlockResponse(
+        return PydanticResponse(fast_response(
+            VerificationBlockResponse,
             success=True,
             sheet_id=request.sheet_id,
             block_index=block.index,
@@ -169,7 +178,7 @@ async def create_verification_block(
             is_fully_signed=True,
             missing_signatures=[],
             created_at=block.timestamp
-        )
+        ))
     
     except HTTPException:
         raise
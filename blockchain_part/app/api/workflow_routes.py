@@ -16,7 +16,8 @@ from app.database import (
     AnswerKeyModel,
     QualityAssessmentModel,
     EvaluationResultModel,
-    PipelineStageModel
+    PipelineStageModel,
+    PipelineStageHistoryModel
 )
 from app.schemas.extended_schemas import (
     CompleteWorkflowRequest,
@@ -32,6 +33,35 @@ from app.services import get_s3_service
 router = APIRouter(prefix="/workflow", tags=["Workflow Orchestration"])
 
 
+def _advance_stage(pipeline: PipelineStageModel, to_stage: str, transition_data: dict = None):
+    """
+    Move pipeline to a new stage, appending one history row for the transition
+    """
+    pipeline.history.append(
+        PipelineStageHistoryModel(
+            from_stage=pipeline.current_stage,
+            to_stage=to_stage,
+            transition_data=transition_data
+        )
+    )
+    pipeline.current_stage = to_stage
+
+
+def _stage_history(pipeline: PipelineStageModel) -> list:
+    """
+    Stage transitions of a pipeline, oldest first, from the history table
+    """
+    return [
+        {
+            "from_stage": row.from_stage,
+            "to_stage": row.to_stage,
+            "at": row.at.isoformat() if row.at else None,
+            "transition_data": row.transition_data
+        }
+        for row in pipeline.history
+    ]
+
+
 @router.post("/complete", response_model=CompleteWorkflowResponse)
 async def complete_workflow(
     request: CompleteWorkflowRequest,
@@ -83,7 +113,7 @@ async def complete_workflow(
         if answer_key.status != "approved":
             raise HTTPException(status_code=400, detail="Answer key must be approved before evaluation")
         
-        pipeline.current_stage = "key_verified"
+        _advance_stage(pipeline, "key_verified")
         pipeline.completed_stages = 1
         db.commit()
         results["steps_completed"].append("answer_key_verification")
@@ -155,7 +185,7 @@ async def complete_workflow(
                 detail="Sheet not approved for evaluation - quality issues detected"
             )
         
-        pipeline.current_stage = "quality_approved"
+        _advance_stage(pipeline, "quality_approved")
         pipeline.completed_stages = 3
         db.commit()
         results["current_stage"] = "quality_approved"
@@ -197,7 +227,7 @@ async def complete_workflow(
             
             results["steps_completed"].append("evaluation")
         
-        pipeline.current_stage = "evaluated"
+        _advance_stage(pipeline, "evaluated")
         pipeline.completed_stages = 5
         db.commit()
         results["current_stage"] = "evaluated"
@@ -222,7 +252,7 @@ async def complete_workflow(
             if not marks_match:
                 results["steps_failed"].append(f"marks_mismatch_detected_discrepancy_{discrepancy}")
         
-        pipeline.current_stage = "completed"
+        _advance_stage(pipeline, "completed")
         pipeline.completed_stages = 7
         pipeline.completed_at = datetime.utcnow()
         db.commit()
@@ -267,28 +297,28 @@ async def update_pipeline_stage(
     """
     try:
         pipeline = db.query(PipelineStageModel).filter(
-            PipelineStageModel.pipeline_id == request.pipeline_id
-        ).first()
+            PipelineStageModel.sheet_id == request.sheet_id
+        ).order_by(PipelineStageModel.id.desc()).first()
         
         if not pipeline:
             raise HTTPException(status_code=404, detail="Pipeline not found")
         
-        pipeline.current_stage = request.current_stage
-        pipeline.completed_stages = request.completed_stages
-        pipeline.stage_data = request.stage_data
-        
-        if request.error_stage:
-            pipeline.error_stage = request.error_stage
-            pipeline.error_message = request.error_message
+        _advance_stage(pipeline, request.new_stage)
+        pipeline.is_blocked = request.is_blocked
+        pipeline.blocked_reason = request.blocked_reason
         
         db.commit()
         
         return PipelineStageResponse(
             success=True,
-            pipeline_id=request.pipeline_id,
+            stage_id=pipeline.stage_id,
+            sheet_id=pipeline.sheet_id,
             current_stage=pipeline.current_stage,
-            completed_stages=pipeline.completed_stages,
-            total_stages=pipeline.total_stages,
+            progress_percentage=pipeline.progress_percentage or 0.0,
+            overall_status=pipeline.overall_status or "in_progress",
+            is_blocked=bool(pipeline.is_blocked),
+            requires_human_approval=bool(pipeline.requires_human_approval),
+            stage_history=_stage_history(pipeline),
             message="Pipeline stage updated"
         )
         
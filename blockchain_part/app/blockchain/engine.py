@@ -64,20 +64,20 @@ class MerkleTree:
         if not data_list:
             return hashlib.sha256(b"").hexdigest()
         
+        sha256 = hashlib.sha256
+        
         # Hash all data elements
-        hashes = [MerkleTree.hash_data(str(data)) for data in data_list]
+        hashes = [sha256(str(data).encode()).hexdigest() for data in data_list]
         
-        # Build tree bottom-up
+        # Build tree bottom-up, one comprehension per level
         while len(hashes) > 1:
             if len(hashes) % 2 != 0:
                 hashes.append(hashes[-1])  # Duplicate last hash if odd
             
-            new_level = []
-            for i in range(0, len(hashes), 2):
-                combined = hashes[i] + hashes[i + 1]
-                new_level.append(hashlib.sha256(combined.encode()).hexdigest())
-            
-            hashes = new_level
+            hashes = [
+                sha256((left + right).encode()).hexdigest()
+                for left, right in zip(hashes[0::2], hashes[1::2])
+            ]
         
         return hashes[0]
 
@@ -1,11 +1,19 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
-import os
+from pathlib import Path
 
 
 class Settings(BaseSettings):
     """Application configuration settings"""
     
+    # Only parse .env when it exists (env may be injected by the orchestrator)
+    model_config = SettingsConfigDict(
+        env_file=".env" if Path(".env").is_file() else None,
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore"
+    )
+    
     # Application
     APP_NAME: str = "OMR_Blockchain_Backend"
     APP_VERSION: str = "1.0.0"
@@ -42,10 +50,6 @@ class Settings(BaseSettings):
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/blockchain_backend.log"
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
 
 
 settings = Settings()
@@ -2,7 +2,9 @@
 Database module
 """
 
-from .connection import Base, engine, SessionLocal, get_db, init_db
+from .connection import Base, engine, SessionLocal, get_db, init_db, optimize_db, run_db_maintenance, maintain_db_periodically
+from .audit_buffer import AuditBuffer
+from .partitions import archive_partitions, select_partitioned
 from .models import (
     BlockModel,
     SheetModel,
@@ -10,6 +12,7 @@ from .models import (
     SignatureModel,
     AuditLogModel,
     ResultModel,
+    ResultBlobModel,
     RecheckRequestModel,
     ResultCacheModel
 )
@@ -19,7 +22,8 @@ from .extended_models import (
     QualityAssessmentModel,
     EvaluationResultModel,
     HumanInterventionModel,
-    PipelineStageModel
+    PipelineStageModel,
+    PipelineStageHistoryModel
 )
 
 __all__ = [
@@ -28,12 +32,19 @@ __all__ = [
     "SessionLocal",
     "get_db",
     "init_db",
+    "optimize_db",
+    "run_db_maintenance",
+    "maintain_db_periodically",
+    "AuditBuffer",
+    "archive_partitions",
+    "select_partitioned",
     "BlockModel",
     "SheetModel",
     "EventModel",
     "SignatureModel",
     "AuditLogModel",
     "ResultModel",
+    "ResultBlobModel",
     "RecheckRequestModel",
     "ResultCacheModel",
     "QuestionPaperModel",
@@ -41,5 +52,6 @@ __all__ = [
     "QualityAssessmentModel",
     "EvaluationResultModel",
     "HumanInterventionModel",
-    "PipelineStageModel"
+    "PipelineStageModel",
+    "PipelineStageHistoryModel"
 ]
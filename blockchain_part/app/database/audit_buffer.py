@@ -0,0 +1,76 @@
+"""
+Buffered writes for audit trail tables (events, audit logs, signatures)
+"""
+
+from typing import Any, Dict, List
+from sqlalchemy import insert, Table
+from sqlalchemy.orm import Session
+
+
+class AuditBuffer:
+    """
+    Collects audit trail rows and writes them with one executemany INSERT
+    per table inside the caller's transaction.
+
+    Usage:
+        with AuditBuffer(db) as buffer:
+            buffer.add(EventModel, event_id=..., event_type=..., ...)
+        # rows inserted and committed once on exit
+    """
+
+    def __init__(self, db: Session, max_rows: int = 100, auto_commit: bool = True):
+        """
+        Args:
+            db: Active database session
+            max_rows: Flush automatically once this many rows are pending
+            auto_commit: Commit the session when leaving the context
+        """
+        self.db = db
+        self.max_rows = max_rows
+        self.auto_commit = auto_commit
+        self._rows: Dict[Table, List[Dict[str, Any]]] = {}
+        self._pending = 0
+
+    def add(self, model, **values) -> None:
+        """Queue a row for the given model's table"""
+        self._rows.setdefault(model.__table__, []).append(values)
+        self._pending += 1
+
+        if self._pending >= self.max_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all pending rows (no commit)"""
+        for table, rows in self._rows.items():
+            if rows:
+                self.db.execute(insert(table), rows)
+
+        self._rows.clear()
+        self._pending = 0
+
+    def commit(self) -> None:
+        """Write all pending rows and commit the transaction"""
+        self.flush()
+        self.db.commit()
+
+    def discard(self) -> None:
+        """Drop pending rows without writing them"""
+        self._rows.clear()
+        self._pending = 0
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def __enter__(self) -> "AuditBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is not None:
+            self.discard()
+            return False
+
+        if self.auto_commit:
+            self.commit()
+        else:
+            self.flush()
+        return False
@@ -1,37 +1,125 @@
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from app.config import settings
+import asyncio
+import logging
+import threading
 import os
 
+logger = logging.getLogger(__name__)
+
 # Create database directory if it doesn't exist
 os.makedirs("data", exist_ok=True)
 
 # Database URL
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
+IS_SQLITE = "sqlite" in SQLALCHEMY_DATABASE_URL
+
 # Create engine
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
+    connect_args={"check_same_thread": False} if IS_SQLITE else {}
 )
 
-# Create sessionmaker
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        Keep temporary tables and indices (sorts, GROUP BY) in memory
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+def _current_task_scope():
+    """
+    Scope sessions to the asyncio task serving the request
+    (falls back to the thread when called outside the event loop)
+    """
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return threading.get_ident()
+
+
+# Create task-scoped session registry
+SessionLocal = scoped_session(
+    sessionmaker(autocommit=False, autoflush=False, bind=engine),
+    scopefunc=_current_task_scope
+)
 
 # Base class for models
 Base = declarative_base()
 
 
-def get_db() -> Session:
+async def get_db() -> Session:
     """
     Dependency for getting database session
+    
+    Runs on the event loop so setup and teardown share the request's task;
+    repeated lookups within a request reuse the same session and identity map.
     """
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        SessionLocal.remove()
+
+
+# Seconds between scheduled maintenance runs
+MAINTENANCE_INTERVAL = 3600
+
+
+def optimize_db():
+    """
+    Refresh SQLite planner statistics (no-op on other databases)
+    
+    Mask 0x10002 checks every table, not only those the pooled connection
+    happened to query; SQLite re-analyzes only tables whose statistics are
+    stale, so the call is cheap when little has changed.
+    """
+    if not IS_SQLITE:
+        return
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("PRAGMA optimize=0x10002"))
+    except SQLAlchemyError:
+        logger.warning("PRAGMA optimize failed", exc_info=True)
+
+
+def run_db_maintenance():
+    """
+    Scheduled upkeep: move finished months of events and audit logs into
+    their partitions (once per month), then refresh planner statistics
+    """
+    from app.database.models import EventModel, AuditLogModel
+    from app.database.partitions import archive_previous_months
+    
+    db = SessionLocal()
+    try:
+        archived = archive_previous_months(db, (EventModel, AuditLogModel))
+        if archived:
+            logger.info("Archived %d audit rows into monthly partitions", archived)
+    except SQLAlchemyError:
+        db.rollback()
+        logger.warning("Archiving audit partitions failed", exc_info=True)
+    finally:
+        SessionLocal.remove()
+    
+    optimize_db()
+
+
+async def maintain_db_periodically(interval: float = MAINTENANCE_INTERVAL):
+    """
+    Run run_db_maintenance every interval seconds, off the event loop
+    """
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(run_db_maintenance)
 
 
 def init_db():
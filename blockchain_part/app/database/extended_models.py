@@ -3,10 +3,10 @@ Extended Database Models for Integrated OMR Evaluation System
 Includes: Question Papers, Answer Keys, Quality Assessments, Manual Marks, etc.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, JSON, Index, func
 from sqlalchemy.orm import relationship
-from datetime import datetime
 from app.database.connection import Base
+from app.database.types import HashColumn, UUIDType
 
 
 class QuestionPaperModel(Base):
@@ -15,8 +15,8 @@ class QuestionPaperModel(Base):
     """
     __tablename__ = "question_papers"
     
-    id = Column(Integer, primary_key=True, index=True)
-    paper_id = Column(String(100), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    paper_id = Column(String(100), unique=True, nullable=False)
     exam_id = Column(String(100), nullable=False, index=True)
     
     # Paper details
@@ -27,25 +27,25 @@ class QuestionPaperModel(Base):
     duration_minutes = Column(Integer)
     
     # File information
-    file_hash = Column(String(64), nullable=False)
+    file_hash = HashColumn(nullable=False)
     s3_url = Column(Text)
     
     # Blockchain reference
     upload_block_id = Column(Integer, ForeignKey("blocks.id"))
-    upload_hash = Column(String(64))
+    upload_hash = HashColumn()
     
     # Status
     status = Column(String(50), default="uploaded")  # uploaded, active, archived
     
     # Timestamps
-    uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    uploaded_at = Column(DateTime, server_default=func.now(), nullable=False)
     created_by = Column(String(100))
     
     # Relationships
     answer_keys = relationship("AnswerKeyModel", back_populates="question_paper")
     
     def __repr__(self):
-        return f"<QuestionPaper {self.paper_id}: {self.subject}>"
+        return "<QuestionPaper %s: %s>" % (self.paper_id, self.subject)
 
 
 class AnswerKeyModel(Base):
@@ -54,8 +54,8 @@ class AnswerKeyModel(Base):
     """
     __tablename__ = "answer_keys"
     
-    id = Column(Integer, primary_key=True, index=True)
-    key_id = Column(String(100), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    key_id = Column(String(100), unique=True, nullable=False)
     paper_id = Column(String(100), ForeignKey("question_papers.paper_id"), nullable=False, index=True)
     exam_id = Column(String(100), nullable=False, index=True)
     
@@ -81,20 +81,20 @@ class AnswerKeyModel(Base):
     
     # Blockchain reference
     verification_block_id = Column(Integer, ForeignKey("blocks.id"))
-    key_hash = Column(String(64), nullable=False)
+    key_hash = HashColumn(nullable=False)
     
     # Status
     status = Column(String(50), default="pending_verification")  # pending_verification, verified, flagged, approved
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
     verified_at = Column(DateTime)
     
     # Relationships
     question_paper = relationship("QuestionPaperModel", back_populates="answer_keys")
     
     def __repr__(self):
-        return f"<AnswerKey {self.key_id}: {self.status}>"
+        return "<AnswerKey %s: %s>" % (self.key_id, self.status)
 
 
 class QualityAssessmentModel(Base):
@@ -103,9 +103,9 @@ class QualityAssessmentModel(Base):
     """
     __tablename__ = "quality_assessments"
     
-    id = Column(Integer, primary_key=True, index=True)
-    assessment_id = Column(String(100), unique=True, nullable=False, index=True)
-    sheet_id = Column(String(100), ForeignKey("sheets.sheet_id"), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    assessment_id = Column(String(100), unique=True, nullable=False)
+    sheet_id = Column(String(100), ForeignKey("sheets.sheet_id"), unique=True, nullable=False)
     
     # Damage detection results
     has_damage = Column(Boolean, default=False)
@@ -125,7 +125,7 @@ class QualityAssessmentModel(Base):
     
     # Reconstruction results (if performed)
     reconstruction_performed = Column(Boolean, default=False)
-    reconstructed_image_hash = Column(String(64))
+    reconstructed_image_hash = HashColumn()
     reconstructed_s3_url = Column(Text)
     reconstruction_quality = Column(Float)
     
@@ -147,13 +147,13 @@ class QualityAssessmentModel(Base):
     
     # Blockchain reference
     assessment_block_id = Column(Integer, ForeignKey("blocks.id"))
-    assessment_hash = Column(String(64))
+    assessment_hash = HashColumn()
     
     # Timestamps
-    assessed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    assessed_at = Column(DateTime, server_default=func.now(), nullable=False)
     
     def __repr__(self):
-        return f"<QualityAssessment {self.sheet_id}: Quality={self.overall_quality_score}>"
+        return "<QualityAssessment %s: Quality=%s>" % (self.sheet_id, self.overall_quality_score)
 
 
 class EvaluationResultModel(Base):
@@ -162,9 +162,9 @@ class EvaluationResultModel(Base):
     """
     __tablename__ = "evaluation_results"
     
-    id = Column(Integer, primary_key=True, index=True)
-    evaluation_id = Column(String(100), unique=True, nullable=False, index=True)
-    sheet_id = Column(String(100), ForeignKey("sheets.sheet_id"), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    evaluation_id = Column(String(100), unique=True, nullable=False)
+    sheet_id = Column(String(100), ForeignKey("sheets.sheet_id"), unique=True, nullable=False)
     key_id = Column(String(100), ForeignKey("answer_keys.key_id"), nullable=False)
     roll_number = Column(String(50), nullable=False, index=True)
     exam_id = Column(String(100), nullable=False, index=True)
@@ -208,13 +208,13 @@ class EvaluationResultModel(Base):
     
     # Blockchain reference
     evaluation_block_id = Column(Integer, ForeignKey("blocks.id"))
-    evaluation_hash = Column(String(64))
+    evaluation_hash = HashColumn()
     
     # Timestamps
-    evaluated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    evaluated_at = Column(DateTime, server_default=func.now(), nullable=False)
     
     def __repr__(self):
-        return f"<EvaluationResult {self.roll_number}: Auto={self.automated_total_marks}, Manual={self.manual_total_marks}>"
+        return "<EvaluationResult %s: Auto=%s, Manual=%s>" % (self.roll_number, self.automated_total_marks, self.manual_total_marks)
 
 
 class HumanInterventionModel(Base):
@@ -223,8 +223,8 @@ class HumanInterventionModel(Base):
     """
     __tablename__ = "human_interventions"
     
-    id = Column(Integer, primary_key=True, index=True)
-    intervention_id = Column(String(100), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    intervention_id = Column(UUIDType, unique=True, nullable=False)
     sheet_id = Column(String(100), ForeignKey("sheets.sheet_id"), nullable=False, index=True)
     
     # Intervention type
@@ -255,13 +255,13 @@ class HumanInterventionModel(Base):
     
     # Blockchain reference
     intervention_block_id = Column(Integer, ForeignKey("blocks.id"))
-    intervention_hash = Column(String(64))
+    intervention_hash = HashColumn()
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
     
     def __repr__(self):
-        return f"<HumanIntervention {self.intervention_type}: {self.status}>"
+        return "<HumanIntervention %s: %s>" % (self.intervention_type, self.status)
 
 
 class PipelineStageModel(Base):
@@ -270,17 +270,14 @@ class PipelineStageModel(Base):
     """
     __tablename__ = "pipeline_stages"
     
-    id = Column(Integer, primary_key=True, index=True)
-    stage_id = Column(String(100), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    stage_id = Column(String(100), unique=True, nullable=False)
     sheet_id = Column(String(100), ForeignKey("sheets.sheet_id"), nullable=False, index=True)
     
     # Current stage
     current_stage = Column(String(50), nullable=False)
     # Stages: uploaded, quality_check, reconstruction, bubble_detection, evaluation, verification, completed
     
-    # Stage history (JSON array of stage transitions)
-    stage_history = Column(JSON, default=list)
-    
     # Flags
     is_blocked = Column(Boolean, default=False)
     blocked_reason = Column(Text)
@@ -295,9 +292,42 @@ class PipelineStageModel(Base):
     overall_status = Column(String(50), default="in_progress")  # in_progress, completed, failed, flagged
     
     # Timestamps
-    started_at = Column(DateTime, default=datetime.utcnow)
-    last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    started_at = Column(DateTime, server_default=func.now())
+    last_updated = Column(DateTime, server_default=func.now(), onupdate=func.now())
     completed_at = Column(DateTime)
     
+    # Relationships (stage transitions, oldest first)
+    history = relationship(
+        "PipelineStageHistoryModel",
+        back_populates="pipeline_stage",
+        order_by=lambda: (PipelineStageHistoryModel.at, PipelineStageHistoryModel.id),
+        lazy="dynamic"
+    )
+    
+    def __repr__(self):
+        return "<PipelineStage %s: %s>" % (self.sheet_id, self.current_stage)
+
+
+class PipelineStageHistoryModel(Base):
+    """
+    Append-only log of pipeline stage transitions
+    """
+    __tablename__ = "pipeline_stage_history"
+    __table_args__ = (
+        Index("ix_psh_stage", "stage_id", "at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    stage_id = Column(String(100), ForeignKey("pipeline_stages.stage_id"), nullable=False)
+    
+    # Transition
+    from_stage = Column(String(50))
+    to_stage = Column(String(50), nullable=False)
+    at = Column(DateTime, server_default=func.now(), nullable=False)
+    transition_data = Column("metadata", JSON)
+    
+    # Relationships
+    pipeline_stage = relationship("PipelineStageModel", back_populates="history")
+    
     def __repr__(self):
-        return f"<PipelineStage {self.sheet_id}: {self.current_stage}>"
+        return "<PipelineStageHistory %s: %s -> %s>" % (self.stage_id, self.from_stage, self.to_stage)
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, JSON, func
 from sqlalchemy.orm import relationship
-from datetime import datetime
 from app.database.connection import Base
+from app.database.types import HashColumn, UUIDType
 
 
 class BlockModel(Base):
@@ -10,22 +10,22 @@ class BlockModel(Base):
     """
     __tablename__ = "blocks"
     
-    id = Column(Integer, primary_key=True, index=True)
-    block_index = Column(Integer, unique=True, nullable=False, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    id = Column(Integer, primary_key=True)
+    block_index = Column(Integer, unique=True, nullable=False)
+    timestamp = Column(DateTime, server_default=func.now(), nullable=False)
     block_type = Column(String(50), nullable=False, index=True)  # scan, bubble, score, verify, result, recheck
-    data_hash = Column(String(64), nullable=False)
-    previous_hash = Column(String(64), nullable=False)
-    block_hash = Column(String(64), unique=True, nullable=False, index=True)
-    merkle_root = Column(String(64), nullable=False)
+    data_hash = HashColumn(nullable=False)
+    previous_hash = HashColumn(nullable=False)
+    block_hash = HashColumn(unique=True, nullable=False)
+    merkle_root = HashColumn(nullable=False)
     nonce = Column(Integer, default=0)
     difficulty = Column(Integer, default=4)
     
-    # Relationships
+    # Relationships (events: live month only, see app.database.partitions)
     events = relationship("EventModel", back_populates="block")
     
     def __repr__(self):
-        return f"<Block {self.block_index}: {self.block_type}>"
+        return "<Block %s: %s>" % (self.block_index, self.block_type)
 
 
 class SheetModel(Base):
@@ -34,26 +34,26 @@ class SheetModel(Base):
     """
     __tablename__ = "sheets"
     
-    id = Column(Integer, primary_key=True, index=True)
-    sheet_id = Column(String(100), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    sheet_id = Column(String(100), unique=True, nullable=False)
     roll_number = Column(String(50), nullable=False, index=True)
     exam_id = Column(String(100), nullable=False, index=True)
     student_name = Column(String(200))
     
     # File information
-    original_file_hash = Column(String(64), nullable=False)
+    original_file_hash = HashColumn(nullable=False)
     s3_url = Column(Text)
-    upload_timestamp = Column(DateTime, default=datetime.utcnow)
+    upload_timestamp = Column(DateTime, server_default=func.now())
     
     # Processing status
     status = Column(String(50), default="uploaded")  # uploaded, scanned, processed, verified, completed
     
     # Lifecycle hashes
-    scan_hash = Column(String(64))
-    bubble_hash = Column(String(64))
-    score_hash = Column(String(64))
-    verify_hash = Column(String(64))
-    result_hash = Column(String(64))
+    scan_hash = HashColumn()
+    bubble_hash = HashColumn()
+    score_hash = HashColumn()
+    verify_hash = HashColumn()
+    result_hash = HashColumn()
     
     # Blockchain references
     scan_block_id = Column(Integer, ForeignKey("blocks.id"))
@@ -63,17 +63,17 @@ class SheetModel(Base):
     result_block_id = Column(Integer, ForeignKey("blocks.id"))
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
-    # Relationships
+    # Relationships (events: live month only, see app.database.partitions)
     events = relationship("EventModel", back_populates="sheet")
     signatures = relationship("SignatureModel", back_populates="sheet")
     results = relationship("ResultModel", back_populates="sheet")
     recheck_requests = relationship("RecheckRequestModel", back_populates="sheet")
     
     def __repr__(self):
-        return f"<Sheet {self.sheet_id}: {self.roll_number}>"
+        return "<Sheet %s: %s>" % (self.sheet_id, self.roll_number)
 
 
 class EventModel(Base):
@@ -82,26 +82,26 @@ class EventModel(Base):
     """
     __tablename__ = "events"
     
-    id = Column(Integer, primary_key=True, index=True)
-    event_id = Column(String(100), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    event_id = Column(UUIDType, unique=True, nullable=False)
     event_type = Column(String(50), nullable=False, index=True)
     sheet_id = Column(String(100), ForeignKey("sheets.sheet_id"), nullable=False, index=True)
     block_id = Column(Integer, ForeignKey("blocks.id"))
     
     # Event data
     event_data = Column(JSON)
-    event_hash = Column(String(64), nullable=False)
+    event_hash = HashColumn(nullable=False)
     
     # Metadata
     triggered_by = Column(String(100))  # system, ai-verifier, human-verifier, admin
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = Column(DateTime, server_default=func.now(), nullable=False)
     
     # Relationships
     sheet = relationship("SheetModel", back_populates="events")
     block = relationship("BlockModel", back_populates="events")
     
     def __repr__(self):
-        return f"<Event {self.event_id}: {self.event_type}>"
+        return "<Event %s: %s>" % (self.event_id, self.event_type)
 
 
 class SignatureModel(Base):
@@ -110,28 +110,28 @@ class SignatureModel(Base):
     """
     __tablename__ = "signatures"
     
-    id = Column(Integer, primary_key=True, index=True)
-    signature_id = Column(String(100), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    signature_id = Column(UUIDType, unique=True, nullable=False)
     sheet_id = Column(String(100), ForeignKey("sheets.sheet_id"), nullable=False, index=True)
     
     # Signature details
     signer_type = Column(String(50), nullable=False)  # ai-verifier, human-verifier, admin-controller
     signer_key = Column(String(200), nullable=False)
-    signature_hash = Column(String(64), nullable=False)
-    signed_data_hash = Column(String(64), nullable=False)
+    signature_hash = HashColumn(nullable=False)
+    signed_data_hash = HashColumn(nullable=False)
     
     # Status
     status = Column(String(20), default="pending")  # pending, approved, rejected
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
     signed_at = Column(DateTime)
     
     # Relationships
     sheet = relationship("SheetModel", back_populates="signatures")
     
     def __repr__(self):
-        return f"<Signature {self.signer_type}: {self.status}>"
+        return "<Signature %s: %s>" % (self.signer_type, self.status)
 
 
 class AuditLogModel(Base):
@@ -140,8 +140,8 @@ class AuditLogModel(Base):
     """
     __tablename__ = "audit_logs"
     
-    id = Column(Integer, primary_key=True, index=True)
-    log_id = Column(String(100), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    log_id = Column(UUIDType, unique=True, nullable=False)
     
     # Log details
     action = Column(String(100), nullable=False)
@@ -158,15 +158,15 @@ class AuditLogModel(Base):
     changes = Column(JSON)
     
     # Blockchain reference
-    blockchain_hash = Column(String(64))
+    blockchain_hash = HashColumn()
     
     # Metadata
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    timestamp = Column(DateTime, server_default=func.now(), nullable=False, index=True)
     ip_address = Column(String(50))
     user_agent = Column(Text)
     
     def __repr__(self):
-        return f"<AuditLog {self.log_id}: {self.action}>"
+        return "<AuditLog %s: %s>" % (self.log_id, self.action)
 
 
 class ResultModel(Base):
@@ -175,9 +175,9 @@ class ResultModel(Base):
     """
     __tablename__ = "results"
     
-    id = Column(Integer, primary_key=True, index=True)
-    result_id = Column(String(100), unique=True, nullable=False, index=True)
-    sheet_id = Column(String(100), ForeignKey("sheets.sheet_id"), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    result_id = Column(UUIDType, unique=True, nullable=False)
+    sheet_id = Column(String(100), ForeignKey("sheets.sheet_id"), unique=True, nullable=False)
     roll_number = Column(String(50), nullable=False, index=True)
     
     # Scores
@@ -199,26 +199,42 @@ class ResultModel(Base):
     arbitration_output = Column(JSON)
     
     # Hashes
-    result_hash = Column(String(64), nullable=False)
-    blockchain_proof_hash = Column(String(64))
+    result_hash = HashColumn(nullable=False)
+    blockchain_proof_hash = HashColumn()
     
     # Verification
     is_verified = Column(Boolean, default=False)
     verified_by = Column(JSON)  # List of verifiers
     verification_timestamp = Column(DateTime)
     
-    # QR Code
-    qr_code_data = Column(Text)  # Base64 encoded QR code
-    
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
     published_at = Column(DateTime)
     
     # Relationships
     sheet = relationship("SheetModel", back_populates="results")
+    blob = relationship("ResultBlobModel", back_populates="result", uselist=False, lazy="raise")
+    
+    def __repr__(self):
+        return "<Result %s: %s>" % (self.roll_number, self.total_marks)
+
+
+class ResultBlobModel(Base):
+    """
+    Large per-result payloads kept out of the results table
+    """
+    __tablename__ = "result_blobs"
+    
+    result_id = Column(UUIDType, ForeignKey("results.result_id"), primary_key=True)
+    
+    # QR Code
+    qr_code = Column(Text)  # Base64 encoded QR code
+    
+    # Relationships
+    result = relationship("ResultModel", back_populates="blob")
     
     def __repr__(self):
-        return f"<Result {self.roll_number}: {self.total_marks}>"
+        return "<ResultBlob %s>" % (self.result_id,)
 
 
 class RecheckRequestModel(Base):
@@ -227,8 +243,8 @@ class RecheckRequestModel(Base):
     """
     __tablename__ = "recheck_requests"
     
-    id = Column(Integer, primary_key=True, index=True)
-    request_id = Column(String(100), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    request_id = Column(UUIDType, unique=True, nullable=False)
     sheet_id = Column(String(100), ForeignKey("sheets.sheet_id"), nullable=False, index=True)
     
     # Request details
@@ -246,10 +262,10 @@ class RecheckRequestModel(Base):
     
     # Blockchain
     recheck_block_id = Column(Integer, ForeignKey("blocks.id"))
-    recheck_hash = Column(String(64))
+    recheck_hash = HashColumn()
     
     # Timestamps
-    requested_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    requested_at = Column(DateTime, server_default=func.now(), nullable=False)
     processed_at = Column(DateTime)
     completed_at = Column(DateTime)
     
@@ -257,7 +273,7 @@ class RecheckRequestModel(Base):
     sheet = relationship("SheetModel", back_populates="recheck_requests")
     
     def __repr__(self):
-        return f"<RecheckRequest {self.request_id}: {self.status}>"
+        return "<RecheckRequest %s: %s>" % (self.request_id, self.status)
 
 
 class ResultCacheModel(Base):
@@ -266,15 +282,15 @@ class ResultCacheModel(Base):
     """
     __tablename__ = "result_cache"
     
-    id = Column(Integer, primary_key=True, index=True)
-    roll_number = Column(String(50), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    roll_number = Column(String(50), unique=True, nullable=False)
     result_data = Column(JSON, nullable=False)
-    blockchain_hash = Column(String(64), nullable=False)
+    blockchain_hash = HashColumn(nullable=False)
     
     # Cache metadata
-    cached_at = Column(DateTime, default=datetime.utcnow)
+    cached_at = Column(DateTime, server_default=func.now())
     expires_at = Column(DateTime)
     is_valid = Column(Boolean, default=True)
     
     def __repr__(self):
-        return f"<ResultCache {self.roll_number}>"
+        return "<ResultCache %s>" % (self.roll_number,)
@@ -0,0 +1,181 @@
+"""
+Monthly partitions for the append-heavy audit tables (events, audit_logs)
+
+The live table holds the current month. archive_partitions() moves older
+rows into per-month shard tables named <table>_YYYY_MM, so the live
+indexes stay shallow. Shards carry no foreign keys, which lets a cold
+month be dropped or moved to an ATTACHed database on its own.
+
+Archived rows are only visible through select_partitioned(). ORM
+relationships (SheetModel.events, BlockModel.events) and plain queries on
+EventModel / AuditLogModel see the live table only, so anything reading
+history older than the current month must go through select_partitioned().
+"""
+
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+from sqlalchemy import Table, Column, MetaData, Index, select, insert, delete, union_all, inspect, func
+from sqlalchemy.orm import Session
+
+# Column used to assign rows to a month
+PARTITION_TIME_COLUMN = "timestamp"
+
+# Autoincrement key breaking timestamp ties (timestamps are per-second on SQLite)
+PARTITION_ORDER_COLUMN = "id"
+
+# Shard tables are kept out of Base.metadata so init_db() never creates them
+partition_metadata = MetaData()
+
+# (database URL, base table name) -> (shard names newest first, time listed).
+# get_partition_table() drops the entry when it creates a shard; the TTL
+# picks up shards archived by other processes.
+_PARTITION_CACHE_TTL = 60.0
+_partition_names: Dict[Tuple[str, str], Tuple[List[str], float]] = {}
+
+# (database URL, base table name) -> month start this process last archived up to
+_archived_before: Dict[Tuple[str, str], datetime] = {}
+
+
+def partition_name(base_table: Table, dt: datetime) -> str:
+    """Shard table name for the month containing dt"""
+    return f"{base_table.name}_{dt:%Y_%m}"
+
+
+def _month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(dt: datetime) -> datetime:
+    if dt.month == 12:
+        return dt.replace(year=dt.year + 1, month=1)
+    return dt.replace(month=dt.month + 1)
+
+
+def _define_partition(base_table: Table, name: str) -> Table:
+    table = partition_metadata.tables.get(name)
+    if table is None:
+        table = Table(
+            name,
+            partition_metadata,
+            *[
+                Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                for c in base_table.columns
+            ]
+        )
+        Index(f"ix_{name}_{PARTITION_TIME_COLUMN}", table.c[PARTITION_TIME_COLUMN])
+    return table
+
+
+def get_partition_table(db: Session, base_table: Table, dt: datetime) -> Table:
+    """
+    Return the shard for the month containing dt, creating it if needed
+    """
+    table = _define_partition(base_table, partition_name(base_table, dt))
+    table.create(bind=db.connection(), checkfirst=True)
+    _partition_names.pop(_cache_key(db, base_table), None)
+    return table
+
+
+def _cache_key(db: Session, base_table: Table) -> Tuple[str, str]:
+    return str(db.get_bind().url), base_table.name
+
+
+def list_partitions(db: Session, base_table: Table) -> List[Table]:
+    """
+    Existing shards for a table, newest month first
+
+    The table list is cached per database, so reads don't run the
+    inspector on every query.
+    """
+    key = _cache_key(db, base_table)
+    cached = _partition_names.get(key)
+    if cached is not None and time.monotonic() - cached[1] < _PARTITION_CACHE_TTL:
+        names = cached[0]
+    else:
+        pattern = re.compile(rf"^{re.escape(base_table.name)}_\d{{4}}_\d{{2}}$")
+        names = sorted(
+            (name for name in inspect(db.connection()).get_table_names() if pattern.match(name)),
+            reverse=True
+        )
+        _partition_names[key] = (names, time.monotonic())
+    return [_define_partition(base_table, name) for name in names]
+
+
+def archive_partitions(db: Session, model, before: datetime) -> int:
+    """
+    Move rows older than `before` from the live table into monthly shards
+
+    Returns:
+        Number of rows moved
+    """
+    base = model.__table__
+    time_col = base.c[PARTITION_TIME_COLUMN]
+    column_names = [c.name for c in base.columns]
+    moved = 0
+
+    oldest = db.execute(select(func.min(time_col)).where(time_col < before)).scalar()
+    while oldest is not None:
+        month_start = _month_start(oldest)
+        upper = min(_next_month(month_start), before)
+        window = (time_col >= month_start) & (time_col < upper)
+
+        shard = get_partition_table(db, base, month_start)
+        db.execute(
+            insert(shard).from_select(column_names, select(*base.columns).where(window))
+        )
+        moved += db.execute(delete(base).where(window)).rowcount
+
+        oldest = db.execute(
+            select(func.min(time_col)).where(time_col >= upper, time_col < before)
+        ).scalar()
+
+    db.commit()
+    # Relisted by other sessions only now that the new shards are committed
+    _partition_names.pop(_cache_key(db, base), None)
+    return moved
+
+
+def archive_previous_months(db: Session, models) -> int:
+    """
+    Archive rows from before the current month, at most once per month
+
+    Meant for the scheduled maintenance task: after the first run in a
+    month, later runs return 0 without querying until the month rolls over.
+
+    Returns:
+        Number of rows moved
+    """
+    month_start = _month_start(datetime.utcnow())
+    moved = 0
+    for model in models:
+        key = _cache_key(db, model.__table__)
+        if _archived_before.get(key) == month_start:
+            continue
+        moved += archive_partitions(db, model, before=month_start)
+        _archived_before[key] = month_start
+    return moved
+
+
+def select_partitioned(db: Session, model, newest_first: bool = True, **filters):
+    """
+    Build a SELECT over the live table and all shards (UNION ALL)
+
+    Rows are ordered by timestamp, then id, so rows written in the same
+    second keep their insertion order: newest first by default, oldest
+    first with newest_first=False. Filters are column == value pairs
+    applied to every partition. Result rows expose the same attribute
+    names as the model's columns.
+    """
+    base = model.__table__
+    selects = [
+        select(*table.columns).where(*[table.c[key] == value for key, value in filters.items()])
+        for table in [base] + list_partitions(db, base)
+    ]
+
+    combined = union_all(*selects).subquery()
+    order = [combined.c[PARTITION_TIME_COLUMN], combined.c[PARTITION_ORDER_COLUMN]]
+    if newest_first:
+        order = [column.desc() for column in order]
+    return select(combined).order_by(*order)
@@ -0,0 +1,43 @@
+"""
+Shared column types for database models
+"""
+
+import uuid
+from sqlalchemy import Column, CHAR, LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+# Length of a hex-encoded SHA-256 digest
+HASH_LENGTH = 64
+
+
+def HashColumn(*args, **kwargs) -> Column:
+    """
+    Fixed-width column for hex SHA-256 digests.
+
+    Hashes are always exactly 64 hex characters, so they are declared as
+    CHAR(64) rather than a variable-length String.
+    """
+    return Column(*args, CHAR(HASH_LENGTH), **kwargs)
+
+
+class UUIDType(TypeDecorator):
+    """
+    Stores UUID surrogate IDs as raw 16 bytes.
+
+    Accepts str or uuid.UUID on the way in and always returns the canonical
+    string form, so callers keep working with plain string IDs.
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=value))
@@ -1,7 +1,24 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Type, TypeVar
+from typing_extensions import TypedDict
 from datetime import datetime
 
+from app.schemas.types import OpaqueJSON
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def fast_response(cls: Type[ModelT], **fields) -> ModelT:
+    """
+    Build a response model from trusted server-side data.
+    
+    Uses model_construct, so no validation or coercion runs. Only use this
+    for responses built from server-side data (the *Response schemas);
+    request schemas must still be validated.
+    """
+    return cls.model_construct(**fields)
+
 
 # ==================== Scan Block Schemas ====================
 
@@ -120,7 +137,9 @@ class VerificationBlockResponse(BaseModel):
 
 # ==================== Result Schemas ====================
 
-class QuestionResult(BaseModel):
+# A TypedDict rather than a model: each answer is validated straight into
+# the plain dict that is hashed and stored, with no per-question model
+class QuestionResult(TypedDict):
     """Result for a single question"""
     question_number: int
     correct_answer: str
@@ -308,7 +327,7 @@ class ErrorResponse(BaseModel):
     """Generic error response"""
     success: bool = False
     error: str
-    details: Optional[Dict[str, Any]] = None
+    details: Optional[OpaqueJSON] = None
 
 
 class SuccessResponse(BaseModel):
@@ -0,0 +1,15 @@
+"""
+Module-level TypeAdapters for response schemas
+
+Building a TypeAdapter compiles its core schema and serializer, so each
+adapter used by the API is built once here and reused by every request.
+"""
+
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.schemas import ScanBlockResponse
+
+SCAN_RESPONSE_ADAPTER = TypeAdapter(ScanBlockResponse)
+SCAN_BATCH_RESPONSE_ADAPTER = TypeAdapter(List[ScanBlockResponse])
@@ -0,0 +1,33 @@
+"""
+Lightweight internal data carriers
+
+Slotted, frozen dataclasses mirroring schemas that are only produced
+server-side. They avoid pydantic construction cost while data moves
+between services; convert with to_schema() at the API boundary.
+
+__slots__ is declared by hand (rather than dataclass(slots=True)) to stay
+compatible with Python 3.9, so every field is required.
+"""
+
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@dataclass(frozen=True)
+class BubbleDataDC:
+    """Internal counterpart of BubbleData"""
+    __slots__ = ("question_number", "detected_answer", "confidence", "bubble_coordinates", "shading_quality")
+    question_number: int
+    detected_answer: Optional[str]
+    confidence: float
+    bubble_coordinates: Dict[str, int]
+    shading_quality: float
+
+
+def to_schema(model_cls: Type[ModelT], data) -> ModelT:
+    """Convert an internal dataclass to its response schema (no validation)"""
+    return model_cls.model_construct(**asdict(data))
@@ -5,6 +5,7 @@ Extended Pydantic Schemas for Integrated OMR Evaluation System
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from uuid import UUID
 
 
 # ==================== Question Paper Schemas ====================
@@ -244,7 +245,7 @@ class HumanInterventionResponse(BaseModel):
 
 class HumanInterventionResolve(BaseModel):
     """Request schema for resolving intervention"""
-    intervention_id: str
+    intervention_id: UUID
     resolved_by: str
     resolution: str
     resolution_data: Optional[Dict[str, Any]] = None
@@ -0,0 +1,14 @@
+"""
+Shared field types for API schemas
+"""
+
+from typing import Any, Dict
+
+from pydantic import SkipValidation
+
+# Free-form JSON object the server builds itself and echoes without
+# inspecting. Accepted as-is (no per-value validation or copy); still
+# documented as an object in the OpenAPI schema. Only for response and
+# internal models: request fields keep Dict[str, Any] so that a client
+# sending a non-object gets a 422 instead of a failure deeper in the route.
+OpaqueJSON = SkipValidation[Dict[str, Any]]
@@ -1,33 +1,318 @@
-import json
+import atexit
+import hashlib
+import logging
 import os
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import re
+import shutil
+import threading
+from collections import OrderedDict, defaultdict, deque
+from operator import itemgetter
+from typing import Dict, Any, Iterator, List, Optional
+from datetime import datetime, timezone
 from pathlib import Path
 import uuid
+
+import orjson
+
 from app.utils.hashing import HashingEngine
 
+logger = logging.getLogger(__name__)
+
+# Event data may carry integer keys (e.g. question numbers). Datetimes and
+# other non-JSON values go through str(), as in HashingEngine.hash_dict, so
+# a re-read entry hashes the same as when it was written.
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+# Starting value of every sheet's hash chain
+_CHAIN_GENESIS = bytes(32)
+
+# Hash index buckets are named by the first two hex digits of the hash
+_HEX_PREFIX_RE = re.compile(r"[0-9a-fA-F]{2}")
+
 
 class AuditLogger:
     """
     Comprehensive JSON-based audit logging system
     Tracks all events chronologically with blockchain hash references
+    
+    Entries are stored as JSON Lines (one entry per line) so an append
+    writes only the new entry. Per-sheet creation time and running report
+    aggregates (event counts, first/last event, blockchain hashes) live in
+    a small {sheet_id}.meta.json sidecar.
+    
+    append_log() only encodes and queues the entry; a background thread
+    writes queued entries in groups, one write per file. Reads do not
+    write: they add still-queued entries to what is on disk, so callers
+    see their own appends. Entries whose write fails stay queued and are
+    retried on the next flush.
+    
+    Blockchain hashes referenced by a sheet's entries are appended to
+    {sheet_id}.hashes, one per line, so a flush never rewrites the full list.
+    
+    Recently read sheet logs are kept in an LRU cache and extended as new
+    entries are flushed, so repeated reads of a hot sheet skip the disk.
+    
+    Each sheet log is hash-chained: chain[i] = sha256(chain[i-1] + line[i])
+    over the exact bytes written, with the tip stored in {sheet_id}.chain.
+    
+    Master log entries with a blockchain hash are indexed by byte offset in
+    hash_index/<prefix>.tsv, so lookups by hash read only matching lines.
+    hash_index/indexed_size records how much of the master log is indexed;
+    a lagging index is caught up and a stale one rebuilt on lookup.
+    
+    Logs in the earlier single-document format ({sheet_id}.json and
+    master_log.json) are converted to JSON Lines once, on startup.
     """
     
-    def __init__(self, log_directory: str = "audit_logs"):
+    def __init__(
+        self,
+        log_directory: str = "audit_logs",
+        flush_interval: float = 0.5,
+        max_pending: int = 1000,
+        cache_size: int = 512
+    ):
+        """
+        Args:
+            log_directory: Directory holding the log files
+            flush_interval: Seconds between background flushes
+            max_pending: Queued entries that trigger an early flush
+            cache_size: Number of sheet logs kept in memory
+        """
         self.log_directory = log_directory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.cache_size = cache_size
         self._ensure_log_directory()
+        self._migrate_legacy_logs()
+        
+        # (sheet_id, encoded line, event_type, timestamp, blockchain_hash)
+        # tuples waiting to be written
+        self._queue: deque = deque()
+        # (encoded line, blockchain_hash) of entries already in their sheet
+        # log but not yet in the master log (its last write failed)
+        self._master_backlog: List[tuple] = []
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flush_thread: Optional[threading.Thread] = None
+        
+        # sheet_id -> {"created_at": ..., "entries": [...]}, least recent first
+        self._sheet_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        
+        # sheet_id -> meta sidecar contents, least recent first
+        self._meta_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        
+        # sheet_id -> current chain tip; and the (size, mtime, tip) last verified
+        self._chain_tips: Dict[str, bytes] = {}
+        self._verified: Dict[str, tuple] = {}
     
     def _ensure_log_directory(self):
         """Create log directory if it doesn't exist"""
         Path(self.log_directory).mkdir(parents=True, exist_ok=True)
     
+    def _migrate_legacy_logs(self):
+        """
+        Convert logs written in the single-document JSON format
+        
+        Each {sheet_id}.json / master_log.json without a .jsonl counterpart
+        is rewritten as JSON Lines, with a meta sidecar (creation time) and
+        chain tip for sheet logs. The .jsonl file is renamed into place last,
+        so an interrupted conversion is redone on the next start. The legacy
+        files are left untouched.
+        """
+        for name in sorted(os.listdir(self.log_directory)):
+            if not name.endswith(".json") or name.endswith(".meta.json"):
+                continue
+            
+            base = name[:-len(".json")]
+            jsonl_path = os.path.join(self.log_directory, base + ".jsonl")
+            if os.path.exists(jsonl_path):
+                continue
+            
+            try:
+                with open(os.path.join(self.log_directory, name), 'rb') as f:
+                    legacy = orjson.loads(f.read())
+            except (OSError, orjson.JSONDecodeError):
+                logger.exception("Skipping unreadable legacy audit log %s", name)
+                continue
+            if not isinstance(legacy, dict) or not isinstance(legacy.get("entries"), list):
+                continue
+            
+            lines = [self._encode_line(entry) for entry in legacy["entries"]]
+            if base != "master_log":
+                tip = _CHAIN_GENESIS
+                for line in lines:
+                    tip = hashlib.sha256(tip + line).digest()
+                self._write_atomic(
+                    self._get_meta_file_path(base),
+                    orjson.dumps({"sheet_id": base, "created_at": legacy.get("created_at")})
+                )
+                self._write_atomic(self._get_chain_file_path(base), tip.hex().encode())
+            self._write_atomic(jsonl_path, b"".join(lines))
+    
     def _get_log_file_path(self, sheet_id: str) -> str:
         """Get log file path for a specific sheet"""
-        return os.path.join(self.log_directory, f"{sheet_id}.json")
+        return os.path.join(self.log_directory, f"{sheet_id}.jsonl")
+    
+    def _get_meta_file_path(self, sheet_id: str) -> str:
+        """Get metadata file path for a specific sheet"""
+        return os.path.join(self.log_directory, f"{sheet_id}.meta.json")
+    
+    def _get_hashes_file_path(self, sheet_id: str) -> str:
+        """Get blockchain hash list file path for a specific sheet"""
+        return os.path.join(self.log_directory, f"{sheet_id}.hashes")
+    
+    def _get_chain_file_path(self, sheet_id: str) -> str:
+        """Get hash chain tip file path for a specific sheet"""
+        return os.path.join(self.log_directory, f"{sheet_id}.chain")
     
     def _get_master_log_path(self) -> str:
         """Get master log file path"""
-        return os.path.join(self.log_directory, "master_log.json")
+        return os.path.join(self.log_directory, "master_log.jsonl")
+    
+    def _get_hash_index_dir(self) -> str:
+        """Get blockchain hash index directory"""
+        return os.path.join(self.log_directory, "hash_index")
+    
+    def _get_hash_index_path(self, blockchain_hash: str, index_dir: Optional[str] = None) -> str:
+        """Get the index bucket file for a blockchain hash"""
+        prefix = blockchain_hash[:2]
+        bucket = prefix.lower() if _HEX_PREFIX_RE.fullmatch(prefix) else "other"
+        return os.path.join(index_dir or self._get_hash_index_dir(), f"{bucket}.tsv")
+    
+    def _get_hash_index_size_path(self, index_dir: Optional[str] = None) -> str:
+        """Get the file recording how many master log bytes are indexed"""
+        return os.path.join(index_dir or self._get_hash_index_dir(), "indexed_size")
+    
+    def _write_hash_index(self, rows: List[tuple], indexed_size: int, index_dir: Optional[str] = None):
+        """
+        Append (blockchain_hash, master log offset) rows to their buckets
+        and record that the master log is indexed up to indexed_size
+        """
+        by_bucket: Dict[str, List[str]] = defaultdict(list)
+        for blockchain_hash, offset in rows:
+            by_bucket[self._get_hash_index_path(blockchain_hash, index_dir)].append(
+                f"{blockchain_hash}\t{offset}\n"
+            )
+        
+        for path, lines in by_bucket.items():
+            self._append_bytes(path, "".join(lines).encode())
+        self._write_atomic(self._get_hash_index_size_path(index_dir), str(indexed_size).encode())
+    
+    def _index_master_log(self, start: int, index_dir: Optional[str] = None):
+        """Index the master log entries from byte offset start onwards"""
+        rows = []
+        offset = start
+        with open(self._get_master_log_path(), 'rb') as f:
+            f.seek(start)
+            for line in f:
+                if line.strip():
+                    blockchain_hash = orjson.loads(line).get("blockchain_hash")
+                    if blockchain_hash:
+                        rows.append((blockchain_hash, offset))
+                offset += len(line)
+        self._write_hash_index(rows, offset, index_dir)
+    
+    def _ensure_hash_index(self, rebuild: bool = False):
+        """
+        Make the hash index cover the whole master log
+        
+        A missing or unusable index is built in a temporary directory and
+        renamed into place, so an interrupted build is never mistaken for
+        a complete one. Master log entries past the recorded indexed size
+        (e.g. after a crash between the two writes) are indexed here.
+        """
+        index_dir = self._get_hash_index_dir()
+        master_log_file = self._get_master_log_path()
+        master_size = os.path.getsize(master_log_file) if os.path.exists(master_log_file) else 0
+        
+        if not rebuild:
+            try:
+                with open(self._get_hash_index_size_path(), 'r') as f:
+                    indexed_size = int(f.read())
+            except (OSError, ValueError):
+                indexed_size = None
+            
+            if indexed_size is not None and indexed_size <= master_size:
+                if indexed_size < master_size:
+                    self._index_master_log(indexed_size)
+                return
+        
+        build_dir = index_dir + ".tmp"
+        shutil.rmtree(build_dir, ignore_errors=True)
+        os.mkdir(build_dir)
+        if master_size:
+            self._index_master_log(0, build_dir)
+        else:
+            self._write_hash_index([], 0, build_dir)
+        shutil.rmtree(index_dir, ignore_errors=True)
+        os.rename(build_dir, index_dir)
+    
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        """
+        Replace a file's contents without a window where it is truncated
+        
+        Writes a temp file, fsyncs it and renames it over the target, so a
+        crash leaves either the old or the new contents.
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
+    def _sync_log_directory(self):
+        """Persist renames in the log directory (POSIX only)"""
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.log_directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    @staticmethod
+    def _encode_line(entry: Dict[str, Any]) -> bytes:
+        """Encode one entry as a JSON line"""
+        return orjson.dumps(entry, default=str, option=_JSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+    
+    @staticmethod
+    def _replay_chain(path: str) -> bytes:
+        """Recompute a hash chain tip from a log file's raw lines"""
+        tip = _CHAIN_GENESIS
+        sha256 = hashlib.sha256
+        with open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    tip = sha256(tip + line).digest()
+        return tip
+    
+    def _read_chain_tip(self, sheet_id: str) -> Optional[bytes]:
+        """Stored chain tip for a sheet, or None if it has no chain file"""
+        chain_file = self._get_chain_file_path(sheet_id)
+        if not os.path.exists(chain_file):
+            return None
+        with open(chain_file, 'r') as f:
+            return bytes.fromhex(f.read().strip())
+    
+    def _chain_tip(self, sheet_id: str) -> bytes:
+        """Current chain tip, replaying logs written before chaining existed"""
+        tip = self._chain_tips.get(sheet_id)
+        if tip is None:
+            tip = self._read_chain_tip(sheet_id)
+        if tip is None:
+            log_file = self._get_log_file_path(sheet_id)
+            tip = self._replay_chain(log_file) if os.path.exists(log_file) else _CHAIN_GENESIS
+        return tip
+    
+    @staticmethod
+    def _read_lines(path: str) -> Iterator[Dict[str, Any]]:
+        """Stream entries from a JSON Lines file"""
+        with open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield orjson.loads(line)
     
     def create_log_entry(
         self,
@@ -52,6 +337,9 @@ class AuditLogger:
         Returns:
             Log entry dictionary
         """
+        # One timestamp for both the entry and its hash input
+        timestamp = datetime.now(timezone.utc).isoformat()
+        
         log_entry = {
             "log_id": str(uuid.uuid4()),
             "sheet_id": sheet_id,
@@ -60,12 +348,12 @@ class AuditLogger:
             "blockchain_hash": blockchain_hash,
             "actor": actor or "system",
             "metadata": metadata or {},
-            "timestamp": datetime.utcnow().isoformat(),
-            "event_hash": HashingEngine.hash_dict({
+            "timestamp": timestamp,
+            "event_hash": HashingEngine.hash_canonical({
                 "sheet_id": sheet_id,
                 "event_type": event_type,
                 "event_data": event_data,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": timestamp
             })
         }
         
@@ -103,56 +391,271 @@ class AuditLogger:
             metadata=metadata
         )
         
-        # Get log file path
-        log_file = self._get_log_file_path(sheet_id)
+        # Encode now so later changes to event_data can't leak into the log
+        self._queue.append((
+            sheet_id,
+            self._encode_line(log_entry),
+            event_type,
+            log_entry["timestamp"],
+            blockchain_hash
+        ))
+        self._ensure_flush_thread()
         
-        # Load existing logs or create new
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-        else:
-            logs = {
-                "sheet_id": sheet_id,
-                "created_at": datetime.utcnow().isoformat(),
-                "entries": []
-            }
+        if len(self._queue) >= self.max_pending:
+            self._wakeup.set()
         
-        # Append new entry
-        logs["entries"].append(log_entry)
-        logs["updated_at"] = datetime.utcnow().isoformat()
-        logs["entry_count"] = len(logs["entries"])
+        return log_entry
+    
+    def _ensure_flush_thread(self):
+        """Start the background flush thread on first append"""
+        if self._flush_thread is not None and self._flush_thread.is_alive():
+            return
+        
+        with self._write_lock:
+            if self._flush_thread is None or not self._flush_thread.is_alive():
+                if self._flush_thread is None:
+                    atexit.register(self.flush)
+                self._flush_thread = threading.Thread(
+                    target=self._flush_loop,
+                    name="audit-log-flush",
+                    daemon=True
+                )
+                self._flush_thread.start()
+    
+    def _flush_loop(self):
+        """Background loop writing queued entries every flush_interval"""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit log flush failed; entries stay queued for the next flush")
+    
+    @staticmethod
+    def _append_bytes(path: str, data: bytes) -> int:
+        """
+        Append data to a file and return the offset it was written at
+        
+        The data is fsynced before returning, so sidecars replaced after
+        the append (chain tip, meta) never describe bytes that a crash
+        could still lose. A failed write is truncated away, so the file
+        never keeps a partial line that a retry would append after.
+        """
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            try:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                f.truncate(offset)
+                raise
+        return offset
+    
+    def flush(self):
+        """
+        Write all queued entries
         
-        # Save logs
-        with open(log_file, 'w') as f:
-            json.dump(logs, f, indent=2)
+        Entries are grouped by sheet and each file (sheet logs and the
+        master log) gets a single write. If a sheet log write fails, that
+        sheet's entries and those of the sheets after it go back to the
+        front of the queue and the error is raised.
+        """
+        with self._write_lock:
+            if not self._queue and not self._master_backlog:
+                return
+            
+            batch: List[tuple] = []
+            by_sheet: Dict[str, List[tuple]] = defaultdict(list)
+            while self._queue:
+                item = self._queue.popleft()
+                batch.append(item)
+                by_sheet[item[0]].append(item)
+            
+            flushed_at = datetime.now(timezone.utc).isoformat()
+            unwritten_sheets = set()
+            error = None
+            for sheet_id, items in by_sheet.items():
+                if error is None:
+                    try:
+                        self._flush_sheet(sheet_id, items, flushed_at)
+                    except Exception as e:
+                        error = e
+                if error is not None:
+                    unwritten_sheets.add(sheet_id)
+            
+            # The master log keeps queue order; unwritten entries go back to
+            # the front of the queue, ahead of anything appended meanwhile
+            self._master_backlog.extend(
+                (item[1], item[4]) for item in batch if item[0] not in unwritten_sheets
+            )
+            self._queue.extendleft(reversed([item for item in batch if item[0] in unwritten_sheets]))
+            
+            self._flush_master()
+            
+            # One directory sync covers every sidecar replaced in this flush
+            self._sync_log_directory()
+            
+            if error is not None:
+                raise error
+    
+    def _flush_sheet(self, sheet_id: str, items: List[tuple], flushed_at: str):
+        """Append one sheet's queued entries and update its sidecars"""
+        lines = [item[1] for item in items]
+        data = b"".join(lines)
+        
+        # Aggregates are updated on a copy, which replaces the cached meta
+        # only once the entries are in the log. Creation time is recorded
+        # the first time a sheet is logged.
+        meta = self._load_meta(sheet_id)
+        if meta is None:
+            meta = self._new_meta(sheet_id, flushed_at)
+        else:
+            meta = {**meta, "event_counts": dict(meta["event_counts"])}
+        
+        hashes = []
+        for _, _, event_type, timestamp, blockchain_hash in items:
+            self._add_to_meta(meta, event_type, timestamp)
+            if blockchain_hash:
+                hashes.append(blockchain_hash)
+        
+        tip = self._chain_tip(sheet_id)
+        for line in lines:
+            tip = hashlib.sha256(tip + line).digest()
+        
+        offset = self._append_bytes(self._get_log_file_path(sheet_id), data)
+        meta["log_size"] = offset + len(data)
+        
+        # The entries are written now; a failure below must not requeue them
+        self._chain_tips[sheet_id] = tip
+        self._remember_meta(sheet_id, meta)
+        cached = self._sheet_cache.get(sheet_id)
+        if cached is not None:
+            cached["entries"].extend(orjson.loads(line) for line in lines)
+        
+        try:
+            self._write_atomic(self._get_chain_file_path(sheet_id), tip.hex().encode())
+            if hashes:
+                self._append_bytes(
+                    self._get_hashes_file_path(sheet_id),
+                    "".join(f"{blockchain_hash}\n" for blockchain_hash in hashes).encode()
+                )
+            self._write_atomic(self._get_meta_file_path(sheet_id), orjson.dumps(meta))
+        except OSError:
+            # The tip is rewritten on the sheet's next flush; the meta no
+            # longer matches the log size, so it is rebuilt on next load
+            self._meta_cache.pop(sheet_id, None)
+            logger.exception("Failed to update audit sidecars for sheet %s", sheet_id)
+    
+    def _flush_master(self):
+        """Append backlogged entries to the master log and index their hashes"""
+        if not self._master_backlog:
+            return
+        
+        self._ensure_hash_index()
+        offset = self._append_bytes(
+            self._get_master_log_path(),
+            b"".join(line for line, _ in self._master_backlog)
+        )
         
-        # Also append to master log
-        self._append_to_master_log(log_entry)
+        index_rows = []
+        for line, blockchain_hash in self._master_backlog:
+            if blockchain_hash:
+                index_rows.append((blockchain_hash, offset))
+            offset += len(line)
+        self._master_backlog = []
+        self._write_hash_index(index_rows, offset)
+    
+    def _pending_items(self, sheet_id: Optional[str] = None) -> List[tuple]:
+        """
+        Queued (not yet written) items, optionally for one sheet
         
-        return log_entry
+        Call with _write_lock held: items only leave the queue under it, so
+        the result and the files on disk never overlap.
+        """
+        return [item for item in self._queue.copy() if sheet_id is None or item[0] == sheet_id]
     
-    def _append_to_master_log(self, log_entry: Dict[str, Any]):
-        """Append entry to master log"""
-        master_log_file = self._get_master_log_path()
+    @staticmethod
+    def _new_meta(sheet_id: str, created_at: Optional[str]) -> Dict[str, Any]:
+        """Empty meta sidecar contents for a sheet"""
+        return {
+            "sheet_id": sheet_id,
+            "created_at": created_at,
+            "entry_count": 0,
+            "event_counts": {},
+            "first_event": None,
+            "last_event": None,
+            "log_size": 0
+        }
+    
+    @staticmethod
+    def _add_to_meta(meta: Dict[str, Any], event_type: str, timestamp: str):
+        """Fold one entry into a sheet's running aggregates"""
+        event_counts = meta["event_counts"]
+        event_counts[event_type] = event_counts.get(event_type, 0) + 1
+        if meta["first_event"] is None:
+            meta["first_event"] = timestamp
+        meta["last_event"] = timestamp
+        meta["entry_count"] += 1
+    
+    def _remember_meta(self, sheet_id: str, meta: Dict[str, Any]):
+        self._meta_cache[sheet_id] = meta
+        self._meta_cache.move_to_end(sheet_id)
+        while len(self._meta_cache) > self.cache_size:
+            self._meta_cache.popitem(last=False)
+    
+    def _load_meta(self, sheet_id: str) -> Optional[Dict[str, Any]]:
+        """
+        A sheet's meta sidecar, or None if the sheet has no log yet
         
-        # Load existing master log
-        if os.path.exists(master_log_file):
-            with open(master_log_file, 'r') as f:
-                master_log = json.load(f)
-        else:
-            master_log = {
-                "created_at": datetime.utcnow().isoformat(),
-                "entries": []
-            }
+        A sidecar that does not cover exactly the current log (written
+        before aggregates were kept, or left behind by a failed or
+        interrupted flush) is rebuilt from the log together with the
+        hashes file. Call with _write_lock held.
+        """
+        meta = self._meta_cache.get(sheet_id)
+        if meta is not None:
+            self._meta_cache.move_to_end(sheet_id)
+            return meta
+        
+        log_file = self._get_log_file_path(sheet_id)
+        if not os.path.exists(log_file):
+            return None
         
-        # Append entry
-        master_log["entries"].append(log_entry)
-        master_log["updated_at"] = datetime.utcnow().isoformat()
-        master_log["entry_count"] = len(master_log["entries"])
+        meta_file = self._get_meta_file_path(sheet_id)
+        stored = {}
+        if os.path.exists(meta_file):
+            with open(meta_file, 'rb') as f:
+                stored = orjson.loads(f.read())
         
-        # Save
-        with open(master_log_file, 'w') as f:
-            json.dump(master_log, f, indent=2)
+        log_size = os.path.getsize(log_file)
+        if "event_counts" in stored and stored.get("log_size") == log_size:
+            meta = stored
+        else:
+            meta = self._new_meta(sheet_id, stored.get("created_at"))
+            hashes = []
+            for entry in self._read_lines(log_file):
+                self._add_to_meta(meta, entry["event_type"], entry["timestamp"])
+                if entry.get("blockchain_hash"):
+                    hashes.append(entry["blockchain_hash"])
+            meta["log_size"] = log_size
+            self._write_atomic(
+                self._get_hashes_file_path(sheet_id),
+                "".join(f"{blockchain_hash}\n" for blockchain_hash in hashes).encode()
+            )
+            self._write_atomic(meta_file, orjson.dumps(meta))
+        
+        self._remember_meta(sheet_id, meta)
+        return meta
+    
+    def _read_hashes(self, sheet_id: str) -> List[str]:
+        """Blockchain hashes recorded for a sheet, in log order"""
+        hashes_file = self._get_hashes_file_path(sheet_id)
+        if not os.path.exists(hashes_file):
+            return []
+        with open(hashes_file, 'r') as f:
+            return [line.rstrip("\n") for line in f if line.strip()]
     
     def get_sheet_logs(self, sheet_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -164,20 +667,63 @@ class AuditLogger:
         Returns:
             Log data or None if not found
         """
+        with self._write_lock:
+            pending = [orjson.loads(item[1]) for item in self._pending_items(sheet_id)]
+            
+            cached = self._sheet_cache.get(sheet_id)
+            if cached is not None:
+                self._sheet_cache.move_to_end(sheet_id)
+            else:
+                cached = self._load_sheet_log(sheet_id)
+                if cached is None:
+                    if not pending:
+                        return None
+                    cached = {"created_at": None, "entries": []}
+                else:
+                    self._sheet_cache[sheet_id] = cached
+                    while len(self._sheet_cache) > self.cache_size:
+                        self._sheet_cache.popitem(last=False)
+            
+            # Copy so callers can't modify the cached list
+            entries = cached["entries"] + pending
+        
+        created_at = cached["created_at"]
+        return {
+            "sheet_id": sheet_id,
+            "created_at": created_at or (entries[0]["timestamp"] if entries else None),
+            "entries": entries,
+            "updated_at": entries[-1]["timestamp"] if entries else created_at,
+            "entry_count": len(entries)
+        }
+    
+    def _load_sheet_log(self, sheet_id: str) -> Optional[Dict[str, Any]]:
+        """Read a sheet's entries and creation time from disk"""
         log_file = self._get_log_file_path(sheet_id)
         
         if not os.path.exists(log_file):
             return None
         
-        with open(log_file, 'r') as f:
-            return json.load(f)
+        meta_file = self._get_meta_file_path(sheet_id)
+        created_at = None
+        if os.path.exists(meta_file):
+            with open(meta_file, 'rb') as f:
+                created_at = orjson.loads(f.read()).get("created_at")
+        
+        return {
+            "created_at": created_at,
+            "entries": list(self._read_lines(log_file))
+        }
     
-    def get_sheet_timeline(self, sheet_id: str) -> List[Dict[str, Any]]:
+    def get_sheet_timeline(self, sheet_id: str, reverse: bool = False) -> List[Dict[str, Any]]:
         """
         Get chronological timeline of events for a sheet
         
+        Entries are appended in timestamp order, so they are only sorted
+        if a linear check finds an out-of-order pair (e.g. clock skew).
+        
         Args:
             sheet_id: Sheet identifier
+            reverse: Newest event first
         
         Returns:
             List of events sorted by timestamp
@@ -187,10 +733,17 @@ class AuditLogger:
         if not logs:
             return []
         
-        return sorted(
-            logs.get("entries", []),
-            key=lambda x: x["timestamp"]
+        entries = logs.get("entries", [])
+        in_order = all(
+            earlier["timestamp"] <= later["timestamp"]
+            for earlier, later in zip(entries, entries[1:])
         )
+        if not in_order:
+            entries.sort(key=itemgetter("timestamp"))
+        
+        if reverse:
+            entries.reverse()
+        return entries
     
     def get_logs_by_type(
         self,
@@ -232,46 +785,145 @@ class AuditLogger:
         """
         master_log_file = self._get_master_log_path()
         
-        if not os.path.exists(master_log_file):
-            return []
-        
-        with open(master_log_file, 'r') as f:
-            master_log = json.load(f)
-        
-        return [
-            entry for entry in master_log.get("entries", [])
-            if entry.get("blockchain_hash") == blockchain_hash
-        ]
+        with self._write_lock:
+            # Entries not in the master log yet, oldest first
+            pending = [line for line, indexed_hash in self._master_backlog if indexed_hash == blockchain_hash]
+            pending.extend(item[1] for item in self._pending_items() if item[4] == blockchain_hash)
+            
+            entries = []
+            if os.path.exists(master_log_file):
+                entries = self._read_indexed_entries(blockchain_hash)
+                if entries is None:
+                    # Stale or damaged index (e.g. the master log was
+                    # replaced): rebuild it and look up again
+                    logger.warning("Rebuilding audit hash index after a stale lookup")
+                    self._ensure_hash_index(rebuild=True)
+                    entries = self._read_indexed_entries(blockchain_hash) or []
+        
+        entries.extend(orjson.loads(line) for line in pending)
+        return entries
+    
+    def _read_indexed_entries(self, blockchain_hash: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Master log entries the index lists for a hash, or None if the index
+        points at an entry with a different hash. Call with _write_lock held.
+        """
+        self._ensure_hash_index()
+        index_file = self._get_hash_index_path(blockchain_hash)
+        
+        # A row can be written twice if a crash hit before the size update
+        offsets: Dict[int, None] = {}
+        if os.path.exists(index_file):
+            with open(index_file, 'r') as f:
+                for row in f:
+                    indexed_hash, _, offset = row.rstrip("\n").partition("\t")
+                    if indexed_hash == blockchain_hash:
+                        try:
+                            offsets[int(offset)] = None
+                        except ValueError:
+                            return None
+        
+        entries = []
+        with open(self._get_master_log_path(), 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                try:
+                    entry = orjson.loads(f.readline())
+                except orjson.JSONDecodeError:
+                    return None
+                if not isinstance(entry, dict) or entry.get("blockchain_hash") != blockchain_hash:
+                    return None
+                entries.append(entry)
+        return entries
     
-    def verify_log_integrity(self, sheet_id: str) -> tuple[bool, Optional[str]]:
+    def verify_log_integrity(
+        self,
+        sheet_id: str,
+        full_replay: bool = True
+    ) -> tuple[bool, Optional[str]]:
         """
         Verify integrity of log file
         
+        Replays the hash chain over the file's raw lines, compares it with
+        the stored tip and recomputes every entry's event_hash. The tip and
+        file size are captured together under the write lock and exactly
+        that many bytes are replayed, so entries flushed meanwhile can't
+        cause a false mismatch.
+        
         Args:
             sheet_id: Sheet identifier
+            full_replay: Always replay (the default). Pass False to skip the
+                replay when the file's size, mtime and chain tip are unchanged
+                since the last successful check; that is only a metadata
+                check, so an in-place edit that restores the mtime would go
+                unnoticed. Don't use it for tamper checks.
         
         Returns:
             (is_valid, error_message)
         """
-        logs = self.get_sheet_logs(sheet_id)
+        log_file = self._get_log_file_path(sheet_id)
         
-        if not logs:
-            return False, "Log file not found"
-        
-        # Verify each entry's hash
-        for entry in logs.get("entries", []):
-            expected_hash = HashingEngine.hash_dict({
-                "sheet_id": entry["sheet_id"],
-                "event_type": entry["event_type"],
-                "event_data": entry["event_data"],
-                "timestamp": entry["timestamp"]
-            })
+        with self._write_lock:
+            if not os.path.exists(log_file):
+                # Entries still queued have nothing on disk to check yet
+                if self._pending_items(sheet_id):
+                    return True, None
+                return False, "Log file not found"
             
-            if entry.get("event_hash") != expected_hash:
-                return False, f"Invalid hash for log entry {entry['log_id']}"
+            stored_tip = self._read_chain_tip(sheet_id)
+            stat = os.stat(log_file)
+        
+        state = (stat.st_size, stat.st_mtime_ns, stored_tip)
+        if not full_replay and self._verified.get(sheet_id) == state:
+            return True, None
+        
+        error = self._replay_log(sheet_id, log_file, stat.st_size, stored_tip)
+        if error is not None:
+            return False, error
         
+        self._verified[sheet_id] = state
         return True, None
     
+    @staticmethod
+    def _replay_log(
+        sheet_id: str,
+        log_file: str,
+        size: int,
+        stored_tip: Optional[bytes]
+    ) -> Optional[str]:
+        """Check the chain and event hashes of a log's first size bytes"""
+        tip = _CHAIN_GENESIS
+        sha256 = hashlib.sha256
+        remaining = size
+        with open(log_file, 'rb') as f:
+            for line in f:
+                if remaining <= 0:
+                    break
+                line = line[:remaining]
+                remaining -= len(line)
+                if not line.strip():
+                    continue
+                tip = sha256(tip + line).digest()
+                
+                entry = orjson.loads(line)
+                hashed_fields = {
+                    "sheet_id": entry["sheet_id"],
+                    "event_type": entry["event_type"],
+                    "event_data": entry["event_data"],
+                    "timestamp": entry["timestamp"]
+                }
+                event_hash = entry.get("event_hash")
+                
+                # Entries written before orjson hashing used HashingEngine.hash_dict
+                if event_hash != HashingEngine.hash_canonical(hashed_fields) and \
+                        event_hash != HashingEngine.hash_dict(hashed_fields):
+                    return f"Invalid hash for log entry {entry['log_id']}"
+        
+        # Logs written before chaining existed have no tip to compare with
+        if stored_tip is not None and tip != stored_tip:
+            return f"Hash chain mismatch for sheet {sheet_id}"
+        return None
+    
     def generate_audit_report(
         self,
         sheet_id: str
@@ -285,39 +937,39 @@ class AuditLogger:
         Returns:
             Audit report
         """
-        logs = self.get_sheet_logs(sheet_id)
-        
-        if not logs:
+        # Summary fields come from the running aggregates, not an entry scan,
+        # plus any entries still waiting to be written
+        with self._write_lock:
+            pending = self._pending_items(sheet_id)
+            meta = self._load_meta(sheet_id)
+            if meta is not None:
+                meta = {**meta, "event_counts": dict(meta["event_counts"])}
+                blockchain_hashes = self._read_hashes(sheet_id)
+            elif pending:
+                meta = self._new_meta(sheet_id, None)
+                blockchain_hashes = []
+        
+        if meta is None:
             return {"error": "No logs found"}
         
-        entries = logs.get("entries", [])
-        
-        # Count events by type
-        event_counts = {}
-        for entry in entries:
-            event_type = entry["event_type"]
-            event_counts[event_type] = event_counts.get(event_type, 0) + 1
-        
-        # Get blockchain hashes
-        blockchain_hashes = [
-            entry.get("blockchain_hash")
-            for entry in entries
-            if entry.get("blockchain_hash")
-        ]
+        for _, _, event_type, timestamp, blockchain_hash in pending:
+            self._add_to_meta(meta, event_type, timestamp)
+            if blockchain_hash:
+                blockchain_hashes.append(blockchain_hash)
         
         # Verify integrity
         is_valid, error = self.verify_log_integrity(sheet_id)
         
         return {
             "sheet_id": sheet_id,
-            "total_events": len(entries),
-            "event_types": event_counts,
-            "first_event": entries[0]["timestamp"] if entries else None,
-            "last_event": entries[-1]["timestamp"] if entries else None,
+            "total_events": meta["entry_count"],
+            "event_types": meta["event_counts"],
+            "first_event": meta["first_event"],
+            "last_event": meta["last_event"],
             "blockchain_hashes": blockchain_hashes,
             "integrity_verified": is_valid,
             "integrity_error": error,
-            "generated_at": datetime.utcnow().isoformat()
+            "generated_at": datetime.now(timezone.utc).isoformat()
         }
     
     def export_logs(
@@ -341,10 +993,11 @@ class AuditLogger:
             raise ValueError(f"No logs found for sheet {sheet_id}")
         
         if not output_path:
-            output_path = f"audit_export_{sheet_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
+            output_path = f"audit_export_{sheet_id}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json"
         
-        with open(output_path, 'w') as f:
-            json.dump(logs, f, indent=2)
+        # Exports are read by people, so they stay indented
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(logs, default=str, option=_JSON_OPTIONS | orjson.OPT_INDENT_2))
         
         return output_path
 
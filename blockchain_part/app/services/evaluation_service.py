@@ -10,8 +10,11 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'omr-evaluator'))
 
 from typing import Dict, Any, Tuple, List
+from bisect import bisect_right
 import json
 
+import numpy as np
+
 try:
     from omr_system import MarkCalculator
     OMR_EVALUATOR_AVAILABLE = True
@@ -19,6 +22,27 @@ except (ImportError, ValueError, Exception) as e:
     OMR_EVALUATOR_AVAILABLE = False
     print(f"Warning: OMR Evaluator not available: {e}")
 
+# Lower bound (inclusive) of each grade above F, ascending
+GRADE_THRESHOLDS = np.array([40, 50, 60, 70, 80, 90], dtype=np.float64)
+GRADES = np.array(["F", "D", "C", "B", "B+", "A", "A+"])
+_GRADE_THRESHOLD_LIST = GRADE_THRESHOLDS.tolist()
+_GRADE_LIST = GRADES.tolist()
+
+
+def _by_question_number(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Re-key a per-question dict so "1" finds entries given as "1" or "Q1"
+    
+    Plain number keys win over "Q"-prefixed ones, matching the previous
+    get(q_num, get(q_key)) lookup order.
+    """
+    normalized = {
+        key[1:]: value for key, value in values.items()
+        if isinstance(key, str) and key.startswith("Q")
+    }
+    normalized.update(values)
+    return normalized
+
 
 class OMREvaluationService:
     """
@@ -56,14 +80,20 @@ class OMREvaluationService:
             calculator = MarkCalculator(answer_key)
             total_marks, details = calculator.calculate(detected_answers)
             
-            # Calculate statistics
-            correct_count = sum(1 for d in details if d["is_correct"])
-            incorrect_count = sum(1 for d in details if not d["is_correct"] and d["student_answer"] != "X")
-            unanswered_count = sum(1 for d in details if d["student_answer"] == "X")
+            # Calculate statistics in a single pass over the details
+            correct_count = incorrect_count = unanswered_count = 0
+            max_marks = 0
+            for d in details:
+                if d["is_correct"]:
+                    correct_count += 1
+                elif d["student_answer"] == "X":
+                    unanswered_count += 1
+                else:
+                    incorrect_count += 1
+                max_marks += d["marks_possible"]
             total_questions = len(details)
             
             # Calculate percentage
-            max_marks = sum(d["marks_possible"] for d in details)
             percentage = (total_marks / max_marks * 100) if max_marks > 0 else 0.0
             
             # Assign grade
@@ -71,9 +101,10 @@ class OMREvaluationService:
             
             # Add confidence to details
             if detection_confidence:
+                confidence_by_num = _by_question_number(detection_confidence)
                 for detail in details:
                     q_num = detail["question"].replace("Q", "")
-                    detail["confidence"] = detection_confidence.get(q_num, detection_confidence.get(detail["question"], 0.0))
+                    detail["confidence"] = confidence_by_num.get(q_num, 0.0)
             else:
                 for detail in details:
                     detail["confidence"] = 1.0
@@ -101,50 +132,53 @@ class OMREvaluationService:
     ) -> Dict[str, Any]:
         """
         Simple fallback evaluation without MarkCalculator
+        
+        Marks and counts are computed with NumPy over the whole sheet; the
+        per-question details are built in one pass afterwards.
         """
-        total_marks = 0.0
-        correct_count = 0
-        incorrect_count = 0
-        unanswered_count = 0
-        max_marks = 0.0
-        details = []
+        q_keys = list(answer_key)
+        q_nums = [q_key.replace("Q", "") for q_key in q_keys]
+        correct_answers = [answer_key[q_key]["answer"] for q_key in q_keys]
+        question_marks = [answer_key[q_key]["marks"] for q_key in q_keys]
+        answers_by_num = _by_question_number(detected_answers)
+        student_answers = [answers_by_num.get(q_num, "X") for q_num in q_nums]
         
-        for q_key, q_data in answer_key.items():
-            q_num = q_key.replace("Q", "")
-            correct_answer = q_data["answer"]
-            question_marks = q_data["marks"]
-            max_marks += question_marks
-            
-            student_answer = detected_answers.get(q_num, detected_answers.get(q_key, "X"))
-            
-            if student_answer == "X" or student_answer is None:
-                unanswered_count += 1
-                earned_marks = 0
-                is_correct = False
-            elif student_answer == correct_answer:
-                correct_count += 1
-                earned_marks = question_marks
-                is_correct = True
-                total_marks += earned_marks
-            else:
-                incorrect_count += 1
-                earned_marks = 0
-                is_correct = False
-            
-            confidence = 1.0
-            if detection_confidence:
-                confidence = detection_confidence.get(q_num, detection_confidence.get(q_key, 0.0))
-            
-            details.append({
+        correct = np.array(correct_answers, dtype=str)
+        student = np.array(["X" if a is None else a for a in student_answers], dtype=str)
+        marks = np.array(question_marks, dtype=np.float64)
+        
+        answered = student != "X"
+        correct_mask = answered & (student == correct)
+        earned = np.where(correct_mask, marks, 0.0)
+        
+        total_marks = float(earned.sum())
+        max_marks = float(marks.sum())
+        correct_count = int(correct_mask.sum())
+        unanswered_count = len(q_keys) - int(answered.sum())
+        incorrect_count = len(q_keys) - correct_count - unanswered_count
+        
+        if detection_confidence:
+            confidence_by_num = _by_question_number(detection_confidence)
+            confidences = [confidence_by_num.get(q_num, 0.0) for q_num in q_nums]
+        else:
+            confidences = [1.0] * len(q_keys)
+        
+        details = [
+            {
                 "question": q_key,
                 "question_number": int(q_num),
                 "correct_answer": correct_answer,
                 "student_answer": student_answer,
                 "is_correct": is_correct,
-                "marks_earned": earned_marks,
-                "marks_possible": question_marks,
+                "marks_earned": q_marks if is_correct else 0,
+                "marks_possible": q_marks,
                 "confidence": confidence
-            })
+            }
+            for q_key, q_num, correct_answer, student_answer, is_correct, q_marks, confidence in zip(
+                q_keys, q_nums, correct_answers, student_answers,
+                correct_mask.tolist(), question_marks, confidences
+            )
+        ]
         
         percentage = (total_marks / max_marks * 100) if max_marks > 0 else 0.0
         grade = OMREvaluationService._assign_grade(percentage)
@@ -166,20 +200,14 @@ class OMREvaluationService:
         """
         Assign grade based on percentage
         """
-        if percentage >= 90:
-            return "A+"
-        elif percentage >= 80:
-            return "A"
-        elif percentage >= 70:
-            return "B+"
-        elif percentage >= 60:
-            return "B"
-        elif percentage >= 50:
-            return "C"
-        elif percentage >= 40:
-            return "D"
-        else:
-            return "F"
+        return _GRADE_LIST[bisect_right(_GRADE_THRESHOLD_LIST, percentage)]
+    
+    @staticmethod
+    def _assign_grades(percentages: np.ndarray) -> np.ndarray:
+        """
+        Assign grades for a batch of percentages in one vectorized lookup
+        """
+        return GRADES[np.searchsorted(GRADE_THRESHOLDS, percentages, side="right")]
     
     @staticmethod
     def verify_marks_tally(
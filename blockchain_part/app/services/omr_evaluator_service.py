@@ -5,11 +5,14 @@ OMR Evaluator Service - Integrates with the OMR evaluator module
 import os
 import sys
 import json
-import base64
-import tempfile
+import io
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.utils.encoding import b64decode
 
 # Add omr-evaluator to path
 OMR_EVALUATOR_PATH = Path(__file__).parent.parent.parent.parent / "omr-evaluator"
@@ -24,6 +27,13 @@ try:
 except ImportError as e:
     print(f"⚠️ OMR Evaluator not available: {e}")
 
+# Random source and answer options for simulated results
+_mock_rng = np.random.default_rng()
+_MOCK_OPTIONS = np.array(["A", "B", "C", "D"])
+
+# "1" -> "Q1" labels for mark details, built once
+_Q_LABELS = {str(i): sys.intern(f"Q{i}") for i in range(1, 1025)}
+
 
 class OMREvaluatorService:
     """
@@ -32,8 +42,6 @@ class OMREvaluatorService:
     
     def __init__(self):
         self.is_available = OMR_AVAILABLE
-        self.temp_dir = Path(tempfile.gettempdir()) / "omr_evaluations"
-        self.temp_dir.mkdir(exist_ok=True)
     
     def evaluate_sheet(
         self,
@@ -59,13 +67,8 @@ class OMREvaluatorService:
             return self._mock_evaluation(num_questions, answer_key, sheet_id)
         
         try:
-            # Save image to temp file
-            temp_path = self.temp_dir / f"omr_{sheet_id or datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-            with open(temp_path, 'wb') as f:
-                f.write(image_data)
-            
-            # Run OMR detection with voting
-            result = detect_with_voting(str(temp_path), num_questions)
+            # Run OMR detection with voting on the in-memory image
+            result = detect_with_voting(io.BytesIO(image_data), num_questions)
             
             if not result or not result.get("answers"):
                 print("OMR detection returned no valid answers, using mock")
@@ -84,7 +87,7 @@ class OMREvaluatorService:
                 "detected_answers": detected_answers,
                 "detection_details": result.get("details", []),
                 "voting_passes": result.get("passes", 3),
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
                 "method": "omr_ai_voting"
             }
             
@@ -106,12 +109,6 @@ class OMREvaluatorService:
                 response["percentage"] = round((total / max_marks * 100) if max_marks > 0 else 0, 2)
                 response["mark_details"] = calc_results
             
-            # Cleanup
-            try:
-                temp_path.unlink()
-            except:
-                pass
-            
             return response
             
         except Exception as e:
@@ -133,7 +130,7 @@ class OMREvaluatorService:
             if "," in base64_data:
                 base64_data = base64_data.split(",")[1]
             
-            image_data = base64.b64decode(base64_data)
+            image_data = b64decode(base64_data)
             return self.evaluate_sheet(image_data, answer_key, num_questions, sheet_id)
         except Exception as e:
             print(f"Base64 decode error: {e}")
@@ -173,7 +170,7 @@ class OMREvaluatorService:
             max_total += marks_each
             
             results.append({
-                "question": f"Q{q}",
+                "question": _Q_LABELS.get(q) or f"Q{q}",
                 "correct_answer": correct,
                 "student_answer": student,
                 "marks_earned": earned,
@@ -192,11 +189,11 @@ class OMREvaluatorService:
         """
         Generate mock evaluation when real evaluator is unavailable
         """
-        import random
-        
-        # Generate random detected answers
-        options = ["A", "B", "C", "D"]
-        detected = {str(i): random.choice(options) for i in range(1, num_questions + 1)}
+        # Generate random detected answers and confidences in one batch
+        questions = [str(i) for i in range(1, num_questions + 1)]
+        answers = _mock_rng.choice(_MOCK_OPTIONS, size=num_questions).tolist()
+        confidences = _mock_rng.uniform(0.85, 0.99, size=num_questions).round(2).tolist()
+        detected = dict(zip(questions, answers))
         
         response = {
             "success": True,
@@ -204,19 +201,19 @@ class OMREvaluatorService:
             "detected_answers": detected,
             "detection_details": [
                 {
-                    "q": str(i),
-                    "answer": detected[str(i)],
-                    "votes": [detected[str(i)]] * 3,
+                    "q": q,
+                    "answer": answer,
+                    "votes": [answer] * 3,
                     "unanimous": True,
-                    "confidence": round(random.uniform(0.85, 0.99), 2)
+                    "confidence": confidence
                 }
-                for i in range(1, num_questions + 1)
+                for q, answer, confidence in zip(questions, answers, confidences)
             ],
             "voting_passes": 3,
             "unanimous_count": num_questions,
             "total_questions": num_questions,
             "confidence": 0.95,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "method": "mock_evaluation",
             "note": "OMR evaluator unavailable - using simulated results"
         }
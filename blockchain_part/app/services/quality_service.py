@@ -5,21 +5,241 @@ Integrates Smart Sheet Recovery for damage detection and reconstruction
 
 import sys
 import os
-import base64
+import asyncio
+import copy
+import hashlib
+import importlib.util
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, Any, List, Tuple, Optional
 
-# Add smart_sheet_recovery to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'smart_sheet_recovery'))
+from app.utils.encoding import b64_sha256
 
-from typing import Dict, Any, Tuple, Optional
+# smart_sheet_recovery's modules import their siblings (bedrock_client, utils) top-level
+SMART_SHEET_RECOVERY_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'smart_sheet_recovery'))
+
+# Same as BedrockVisionClient.CLAUDE_35_SONNET, without importing the client
+DEFAULT_MODEL_ID = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
+
+
+# Top-level modules smart_sheet_recovery's services import (see its requirements.txt)
+_SMART_SHEET_MODULES = ("smart_sheet_recovery", "cv2", "numpy", "PIL", "boto3", "botocore")
+
+
+def _find_smart_sheet() -> bool:
+    """Check that smart_sheet_recovery and its CV/AWS dependencies are installed, without importing them"""
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in _SMART_SHEET_MODULES)
+    except (ImportError, ValueError):
+        return False
+
+
+_smart_sheet_classes: Optional[Tuple[type, type]] = None
+
+
+def _load_smart_sheet() -> Optional[Tuple[type, type]]:
+    """
+    (DamageDetectionService, ReconstructionService), imported once per process
+    
+    The sys.path entry and the smart_sheet_recovery imports happen on the
+    first call only. If the import still fails, SMART_SHEET_AVAILABLE is
+    cleared and None is returned, so callers fall back as if the package
+    were missing.
+    """
+    global _smart_sheet_classes, SMART_SHEET_AVAILABLE
+    if _smart_sheet_classes is None and SMART_SHEET_AVAILABLE:
+        if SMART_SHEET_RECOVERY_PATH not in sys.path:
+            sys.path.insert(0, SMART_SHEET_RECOVERY_PATH)
+        try:
+            from smart_sheet_recovery.services.damage_detection import DamageDetectionService
+            from smart_sheet_recovery.services.reconstruction import ReconstructionService
+        except ImportError as e:
+            SMART_SHEET_AVAILABLE = False
+            print(f"Warning: Smart Sheet Recovery service not available: {e}")
+            return None
+        _smart_sheet_classes = (DamageDetectionService, ReconstructionService)
+    return _smart_sheet_classes
+
+
+SMART_SHEET_AVAILABLE = _find_smart_sheet()
+if not SMART_SHEET_AVAILABLE:
+    print("Warning: Smart Sheet Recovery service not available")
 
 try:
-    from smart_sheet_recovery.services.damage_detection import DamageDetectionService
-    from smart_sheet_recovery.services.reconstruction import ReconstructionService
-    from smart_sheet_recovery.bedrock_client import BedrockVisionClient
-    SMART_SHEET_AVAILABLE = True
+    from blake3 import blake3 as _fingerprint_hash
 except ImportError:
-    SMART_SHEET_AVAILABLE = False
-    print("Warning: Smart Sheet Recovery service not available")
+    _fingerprint_hash = hashlib.blake2b
+
+
+def _image_fingerprint(image_bytes: bytes) -> str:
+    """
+    Non-cryptographic image fingerprint for cache and dedup keys (BLAKE3,
+    or BLAKE2b without the blake3 package). Stored integrity hashes stay
+    SHA-256.
+    """
+    return _fingerprint_hash(image_bytes).hexdigest()
+
+
+# Recent assessment/reconstruction results, keyed by model and image fingerprint.
+# Routes build a fresh service per request, so the caches live at module level.
+# Entries are deep-copied in and out, so callers never share the nested
+# damage lists or confidence map with the cache. The lock covers batch
+# assessments, which run on worker threads.
+_RESULT_CACHE_SIZE = 512
+_ASSESSMENT_CACHE: "OrderedDict[tuple, Tuple[bool, Dict[str, Any]]]" = OrderedDict()
+_RECONSTRUCTION_CACHE: "OrderedDict[tuple, Tuple[bool, Dict[str, Any]]]" = OrderedDict()
+_RESULT_CACHE_LOCK = threading.Lock()
+
+
+def _cached_result(cache: OrderedDict, key: tuple) -> Optional[Tuple[bool, Dict[str, Any]]]:
+    with _RESULT_CACHE_LOCK:
+        hit = cache.get(key)
+        if hit is None:
+            return None
+        cache.move_to_end(key)
+    return hit[0], copy.deepcopy(hit[1])
+
+
+def _remember_result(cache: OrderedDict, key: tuple, ok: bool, data: Dict[str, Any]) -> None:
+    entry = (ok, copy.deepcopy(data))
+    with _RESULT_CACHE_LOCK:
+        cache[key] = entry
+        cache.move_to_end(key)
+        while len(cache) > _RESULT_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+# Bounded pool for concurrent damage-detection calls in assess_quality_batch
+_DETECT_WORKERS = 16
+_detect_pool: Optional[ThreadPoolExecutor] = None
+_detect_pool_lock = threading.Lock()
+
+
+def _get_detect_pool() -> ThreadPoolExecutor:
+    global _detect_pool
+    if _detect_pool is None:
+        with _detect_pool_lock:
+            if _detect_pool is None:
+                _detect_pool = ThreadPoolExecutor(max_workers=_DETECT_WORKERS, thread_name_prefix="damage-detect")
+    return _detect_pool
+
+
+# Scoring thresholds
+_MIN_APPROVED_QUALITY = 0.7      # below this a damaged sheet needs reconstruction
+_MIN_UNREVIEWED_QUALITY = 0.6    # below this a damaged sheet is flagged for review
+_MIN_AUTOMATIC_QUALITY = 0.5     # below this a human has to intervene
+_MAX_AUTOMATIC_SEVERE = 3        # more severe regions than this need a human
+
+def _score_damage(merged_damages: Dict[str, Any], model_id: Optional[str]) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Turn one merged damage-detection result into (approved, assessment_data)
+    """
+    total_count = merged_damages.get("total_count", 0)
+    severe_count = merged_damages.get("severe_count", 0)
+    quality_score = merged_damages.get("overall_quality_score", 1.0)
+    is_recoverable = merged_damages.get("is_recoverable", True)
+    has_damage = total_count > 0
+    
+    # Determine damage severity
+    if severe_count > 5:
+        damage_severity = "severe"
+    elif severe_count > 2:
+        damage_severity = "high"
+    elif total_count > 5:
+        damage_severity = "medium"
+    elif has_damage:
+        damage_severity = "low"
+    else:
+        damage_severity = None
+    
+    # Determine if reconstruction is needed
+    requires_reconstruction = (
+        has_damage and
+        quality_score < _MIN_APPROVED_QUALITY and
+        is_recoverable
+    )
+    
+    # Determine if human intervention is needed
+    requires_human_intervention = (
+        not is_recoverable or
+        severe_count > _MAX_AUTOMATIC_SEVERE or
+        quality_score < _MIN_AUTOMATIC_QUALITY
+    )
+    
+    # Determine if approved for evaluation
+    approved_for_evaluation = (
+        (not has_damage) or
+        (quality_score >= _MIN_APPROVED_QUALITY and is_recoverable)
+    )
+    
+    # Determine if flagged for review
+    flagged_for_review = (
+        requires_human_intervention or
+        (has_damage and quality_score < _MIN_UNREVIEWED_QUALITY)
+    )
+    
+    # Flag reason
+    flag_reason = None
+    if not is_recoverable:
+        flag_reason = "Sheet damage is too severe and not recoverable"
+    elif severe_count > _MAX_AUTOMATIC_SEVERE:
+        flag_reason = f"Sheet has {severe_count} severe damage regions"
+    elif quality_score < _MIN_AUTOMATIC_QUALITY:
+        flag_reason = f"Overall quality score too low: {quality_score:.2f}"
+    elif flagged_for_review:
+        flag_reason = "Quality assessment requires human review"
+    
+    assessment_data = {
+        "has_damage": has_damage,
+        "damage_types": merged_damages.get("damage_types", []),
+        "damage_severity": damage_severity,
+        "damage_regions": merged_damages.get("damages", []),
+        "overall_quality_score": quality_score,
+        "bubble_clarity_score": quality_score,  # Simplified
+        "sheet_alignment_score": quality_score,  # Simplified
+        "is_recoverable": is_recoverable,
+        "requires_reconstruction": requires_reconstruction,
+        "approved_for_evaluation": approved_for_evaluation,
+        "flagged_for_review": flagged_for_review,
+        "flag_reason": flag_reason,
+        "requires_human_intervention": requires_human_intervention,
+        "assessment_model": model_id,
+        "total_damage_count": total_count,
+        "severe_damage_count": severe_count
+    }
+    
+    return approved_for_evaluation, assessment_data
+
+
+# Fallback assessment when Smart Sheet Recovery is missing (assume good
+# quality); returned as a copy so callers may modify or serialize it
+_DEFAULT_ASSESSMENT = MappingProxyType({
+    "has_damage": False,
+    "overall_quality_score": 0.95,
+    "is_recoverable": True,
+    "requires_reconstruction": False,
+    "approved_for_evaluation": True,
+    "flagged_for_review": False,
+    "requires_human_intervention": False,
+    "warning": "Smart Sheet Recovery not available - using default assessment"
+})
+
+
+def _error_assessment(e: Exception) -> Tuple[bool, Dict[str, Any]]:
+    # On error, flag for review
+    return False, {
+        "has_damage": True,
+        "overall_quality_score": 0.0,
+        "is_recoverable": False,
+        "requires_reconstruction": False,
+        "approved_for_evaluation": False,
+        "flagged_for_review": True,
+        "flag_reason": f"Quality assessment error: {str(e)}",
+        "requires_human_intervention": True,
+        "error": str(e)
+    }
 
 
 class QualityAssessmentService:
@@ -27,21 +247,43 @@ class QualityAssessmentService:
     Service for OMR sheet quality assessment
     """
     
-    def __init__(self, model_id: str = None):
+    def __init__(self, model_id: str = None, performance_config: str = "optimized"):
         """
         Initialize quality assessment service
         
         Args:
             model_id: Bedrock model ID to use (defaults to Claude 3.5 Sonnet)
+            performance_config: Bedrock latency mode; "optimized" falls back to
+                "standard" for models without latency-optimized inference
         """
-        if SMART_SHEET_AVAILABLE:
-            self.model_id = model_id or BedrockVisionClient.CLAUDE_35_SONNET
-            self.damage_service = DamageDetectionService(model_id=self.model_id)
-            self.reconstruction_service = ReconstructionService(model_id=self.model_id)
-        else:
-            self.model_id = None
-            self.damage_service = None
-            self.reconstruction_service = None
+        self.model_id = (model_id or DEFAULT_MODEL_ID) if SMART_SHEET_AVAILABLE else None
+        self.performance_config = performance_config
+        
+        # Built on first use (see the properties below)
+        self._damage_service = None
+        self._reconstruction_service = None
+    
+    @property
+    def damage_service(self):
+        """Damage detection service, imported and constructed on first access"""
+        if self._damage_service is None and _load_smart_sheet() is not None:
+            DamageDetectionService, _ = _load_smart_sheet()
+            self._damage_service = DamageDetectionService(
+                model_id=self.model_id,
+                performance_config=self.performance_config
+            )
+        return self._damage_service
+    
+    @property
+    def reconstruction_service(self):
+        """Reconstruction service, imported and constructed on first access"""
+        if self._reconstruction_service is None and _load_smart_sheet() is not None:
+            _, ReconstructionService = _load_smart_sheet()
+            self._reconstruction_service = ReconstructionService(
+                model_id=self.model_id,
+                performance_config=self.performance_config
+            )
+        return self._reconstruction_service
     
     def assess_quality(self, image_bytes: bytes) -> Tuple[bool, Dict[str, Any]]:
         """
@@ -54,114 +296,79 @@ class QualityAssessmentService:
             (approved_for_evaluation, assessment_data)
         """
         
-        if not SMART_SHEET_AVAILABLE:
-            # Fallback: assume good quality
-            return True, {
-                "has_damage": False,
-                "overall_quality_score": 0.95,
-                "is_recoverable": True,
-                "requires_reconstruction": False,
-                "approved_for_evaluation": True,
-                "flagged_for_review": False,
-                "requires_human_intervention": False,
-                "warning": "Smart Sheet Recovery not available - using default assessment"
-            }
+        if _load_smart_sheet() is None:
+            return True, dict(_DEFAULT_ASSESSMENT)
+        
+        return self._assess_fingerprinted(image_bytes, _image_fingerprint(image_bytes))
+    
+    async def assess_quality_batch(self, images: List[bytes]) -> List[Tuple[bool, Dict[str, Any]]]:
+        """
+        Assess a burst of OMR sheets concurrently
+        
+        Each distinct image (by fingerprint) is assessed once, through the
+        same cache and scoring as assess_quality, on a bounded thread pool
+        shared by all batches. Repeated images get their own copy of the
+        result.
+        
+        Args:
+            images: Image bytes of each OMR sheet
+            
+        Returns:
+            (approved_for_evaluation, assessment_data) per image, in order
+        """
+        if _load_smart_sheet() is None:
+            return [(True, dict(_DEFAULT_ASSESSMENT)) for _ in images]
+        
+        fingerprints = [_image_fingerprint(image) for image in images]
+        distinct = dict(zip(fingerprints, images))
+        
+        # Build the damage service once here rather than racing to build it
+        # on the worker threads
+        try:
+            self.damage_service
+        except Exception as e:
+            return [_error_assessment(e) for _ in images]
+        
+        loop = asyncio.get_running_loop()
+        pool = _get_detect_pool()
+        assessed = await asyncio.gather(*(
+            loop.run_in_executor(pool, self._assess_fingerprinted, image, fingerprint)
+            for fingerprint, image in distinct.items()
+        ))
+        by_fingerprint = dict(zip(distinct, assessed))
+        
+        results = []
+        seen = set()
+        for fingerprint in fingerprints:
+            approved, data = by_fingerprint[fingerprint]
+            if fingerprint in seen:
+                data = copy.deepcopy(data)
+            seen.add(fingerprint)
+            results.append((approved, data))
+        return results
+    
+    def _assess_fingerprinted(self, image_bytes: bytes, fingerprint: str) -> Tuple[bool, Dict[str, Any]]:
+        cache_key = (self.model_id, fingerprint)
+        cached = _cached_result(_ASSESSMENT_CACHE, cache_key)
+        if cached is not None:
+            return cached
         
         try:
             # Step 1: Detect damage
-            damage_results = self.damage_service.detect_damage(image_bytes)
-            
-            merged_damages = damage_results.get("merged_damages", {})
-            
-            # Extract damage information
-            has_damage = merged_damages.get("total_count", 0) > 0
-            severe_count = merged_damages.get("severe_count", 0)
-            quality_score = merged_damages.get("overall_quality_score", 1.0)
-            is_recoverable = merged_damages.get("is_recoverable", True)
-            
-            # Determine damage severity
-            if severe_count > 5:
-                damage_severity = "severe"
-            elif severe_count > 2:
-                damage_severity = "high"
-            elif merged_damages.get("total_count", 0) > 5:
-                damage_severity = "medium"
-            elif has_damage:
-                damage_severity = "low"
-            else:
-                damage_severity = None
-            
-            # Determine if reconstruction is needed
-            requires_reconstruction = (
-                has_damage and 
-                quality_score < 0.7 and 
-                is_recoverable
-            )
-            
-            # Determine if human intervention is needed
-            requires_human_intervention = (
-                not is_recoverable or
-                severe_count > 3 or
-                quality_score < 0.5
-            )
-            
-            # Determine if approved for evaluation
-            approved_for_evaluation = (
-                (not has_damage) or
-                (quality_score >= 0.7 and is_recoverable)
-            )
+            merged_damages = self._detect_merged_damages(image_bytes)
             
-            # Determine if flagged for review
-            flagged_for_review = (
-                requires_human_intervention or
-                (has_damage and quality_score < 0.6)
-            )
-            
-            # Flag reason
-            flag_reason = None
-            if not is_recoverable:
-                flag_reason = "Sheet damage is too severe and not recoverable"
-            elif severe_count > 3:
-                flag_reason = f"Sheet has {severe_count} severe damage regions"
-            elif quality_score < 0.5:
-                flag_reason = f"Overall quality score too low: {quality_score:.2f}"
-            elif flagged_for_review:
-                flag_reason = "Quality assessment requires human review"
-            
-            assessment_data = {
-                "has_damage": has_damage,
-                "damage_types": merged_damages.get("damage_types", []),
-                "damage_severity": damage_severity,
-                "damage_regions": merged_damages.get("damages", []),
-                "overall_quality_score": quality_score,
-                "bubble_clarity_score": quality_score,  # Simplified
-                "sheet_alignment_score": quality_score,  # Simplified
-                "is_recoverable": is_recoverable,
-                "requires_reconstruction": requires_reconstruction,
-                "approved_for_evaluation": approved_for_evaluation,
-                "flagged_for_review": flagged_for_review,
-                "flag_reason": flag_reason,
-                "requires_human_intervention": requires_human_intervention,
-                "assessment_model": self.model_id,
-                "total_damage_count": merged_damages.get("total_count", 0),
-                "severe_damage_count": severe_count
-            }
+            # Step 2: Score
+            approved_for_evaluation, assessment_data = _score_damage(merged_damages, self.model_id)
             
+            _remember_result(_ASSESSMENT_CACHE, cache_key, approved_for_evaluation, assessment_data)
             return approved_for_evaluation, assessment_data
             
         except Exception as e:
-            # On error, flag for review
-            return False, {
-                "has_damage": True,
-                "overall_quality_score": 0.0,
-                "is_recoverable": False,
-                "requires_reconstruction": False,
-                "approved_for_evaluation": False,
-                "flagged_for_review": True,
-                "flag_reason": f"Quality assessment error: {str(e)}",
-                "requires_human_intervention": True,
-                "error": str(e)
-            }
+            return _error_assessment(e)
+    
+    def _detect_merged_damages(self, image_bytes: bytes) -> Dict[str, Any]:
+        damage_results = self.damage_service.detect_damage(image_bytes)
+        return damage_results.get("merged_damages", {})
     
     def reconstruct_sheet(
         self,
@@ -181,11 +388,21 @@ class QualityAssessmentService:
             (success, reconstruction_data)
         """
         
-        if not SMART_SHEET_AVAILABLE:
+        if _load_smart_sheet() is None:
             return False, {
                 "error": "Smart Sheet Recovery not available"
             }
         
+        cache_key = (
+            self.model_id,
+            _image_fingerprint(image_bytes),
+            expected_rows,
+            expected_cols
+        )
+        cached = _cached_result(_RECONSTRUCTION_CACHE, cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Perform reconstruction
             result = self.reconstruction_service.reconstruct_sheet(
@@ -198,10 +415,8 @@ class QualityAssessmentService:
             reconstructed_image_b64 = result.get("reconstructed_image")
             
             if reconstructed_image_b64:
-                # Decode to get hash
-                import hashlib
-                reconstructed_bytes = base64.b64decode(reconstructed_image_b64)
-                reconstructed_hash = hashlib.sha256(reconstructed_bytes).hexdigest()
+                # Hash of the decoded image (stored in a SHA-256 HashColumn)
+                reconstructed_hash = b64_sha256(reconstructed_image_b64)
             else:
                 reconstructed_hash = None
             
@@ -217,6 +432,7 @@ class QualityAssessmentService:
                 "reconstruction_performed": True
             }
             
+            _remember_result(_RECONSTRUCTION_CACHE, cache_key, True, reconstruction_data)
             return True, reconstruction_data
             
         except Exception as e:
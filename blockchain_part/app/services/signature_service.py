@@ -1,11 +1,18 @@
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from enum import Enum
+import hashlib
+import hmac
 import uuid
 from app.utils.hashing import HashingEngine
 from app.config import settings
 
 
+def _utcnow_iso() -> str:
+    """Current UTC time as a naive ISO-8601 string (the stored signature format)"""
+    return datetime.utcnow().isoformat()
+
+
 class SignerType(str, Enum):
     """Types of signers in the multi-signature system"""
     AI_VERIFIER = "ai-verifier"
@@ -25,41 +32,68 @@ class Signature:
     Individual signature object
     """
     
+    __slots__ = (
+        "signature_id",
+        "signer_type",
+        "signer_key",
+        "signed_data",
+        "signed_data_hash",
+        "signature_hash",
+        "status",
+        "created_at",
+        "signed_at"
+    )
+    
     def __init__(
         self,
         signer_type: SignerType,
         signer_key: str,
-        signed_data: Dict[str, Any]
+        signed_data: Dict[str, Any],
+        signed_data_hash: Optional[str] = None,
+        now: Optional[str] = None
     ):
+        """
+        Args:
+            signer_type: Type of signer
+            signer_key: Signer's key, used as the HMAC key
+            signed_data: Data being signed
+            signed_data_hash: Precomputed HashingEngine.hash_dict(signed_data)
+            now: Creation timestamp (ISO string) shared with the caller's operation
+        """
         self.signature_id = str(uuid.uuid4())
         self.signer_type = signer_type
         self.signer_key = signer_key
         self.signed_data = signed_data
-        self.signed_data_hash = HashingEngine.hash_dict(signed_data)
-        self.signature_hash = self._generate_signature()
+        self.signed_data_hash = signed_data_hash or HashingEngine.hash_dict(signed_data)
         self.status = SignatureStatus.PENDING
-        self.created_at = datetime.utcnow().isoformat()
+        self.created_at = now or _utcnow_iso()
         self.signed_at = None
+        self.signature_hash = self._generate_signature()
+    
+    @staticmethod
+    def _sign_bytes(signer_type_value: str, signer_key: str, data_hash_hex: str, ts: str) -> str:
+        """HMAC-SHA256 of signer type, data hash and timestamp, keyed by the signer key"""
+        message = b"|".join((signer_type_value.encode(), data_hash_hex.encode(), ts.encode()))
+        return hmac.new(signer_key.encode(), message, hashlib.sha256).hexdigest()
     
     def _generate_signature(self) -> str:
         """Generate signature hash using HMAC"""
-        signature_data = {
-            "signer_type": self.signer_type.value,
-            "signer_key": self.signer_key,
-            "data_hash": self.signed_data_hash,
-            "timestamp": self.created_at
-        }
-        return HashingEngine.hash_dict(signature_data)
+        return self._sign_bytes(
+            self.signer_type.value,
+            self.signer_key,
+            self.signed_data_hash,
+            self.created_at
+        )
     
-    def approve(self) -> None:
+    def approve(self, now: Optional[str] = None) -> None:
         """Approve the signature"""
         self.status = SignatureStatus.APPROVED
-        self.signed_at = datetime.utcnow().isoformat()
+        self.signed_at = now or _utcnow_iso()
     
-    def reject(self) -> None:
+    def reject(self, now: Optional[str] = None) -> None:
         """Reject the signature"""
         self.status = SignatureStatus.REJECTED
-        self.signed_at = datetime.utcnow().isoformat()
+        self.signed_at = now or _utcnow_iso()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert signature to dictionary"""
@@ -81,16 +115,36 @@ class MultiSignatureEngine:
     Requires signatures from AI-verifier, Human-verifier, and Admin-controller
     """
     
+    __slots__ = (
+        "required_signatures",
+        "expected_signers",
+        "authorized_keys",
+        "_expected_signer_values",
+        "_slots",
+        "_collected"
+    )
+    
+    # Slot of each expected signer in _slots
+    _INDEX = {
+        SignerType.AI_VERIFIER: 0,
+        SignerType.HUMAN_VERIFIER: 1,
+        SignerType.ADMIN_CONTROLLER: 2
+    }
+    
     def __init__(self, required_signatures: int = 3):
         self.required_signatures = required_signatures
-        self.signatures: Dict[str, Signature] = {}
         
-        # Expected signer types
+        # Expected signer types (in slot order)
         self.expected_signers = [
             SignerType.AI_VERIFIER,
             SignerType.HUMAN_VERIFIER,
             SignerType.ADMIN_CONTROLLER
         ]
+        self._expected_signer_values = tuple(s.value for s in self.expected_signers)
+        
+        # One slot per expected signer; None until that signer has signed
+        self._slots: List[Optional[Signature]] = [None] * len(self.expected_signers)
+        self._collected = 0
         
         # Signer keys from configuration
         self.authorized_keys = {
@@ -99,6 +153,15 @@ class MultiSignatureEngine:
             SignerType.ADMIN_CONTROLLER: settings.ADMIN_CONTROLLER_KEY
         }
     
+    @property
+    def signatures(self) -> Dict[str, Signature]:
+        """Collected signatures keyed by signer type value (built on access)"""
+        return {
+            value: sig
+            for value, sig in zip(self._expected_signer_values, self._slots)
+            if sig is not None
+        }
+    
     def create_signature_request(
         self,
         sheet_id: str,
@@ -123,7 +186,7 @@ class MultiSignatureEngine:
             "result_hash": HashingEngine.hash_dict(result_data),
             "required_signatures": self.required_signatures,
             "expected_signers": [s.value for s in self.expected_signers],
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": _utcnow_iso(),
             "status": "pending"
         }
     
@@ -131,7 +194,8 @@ class MultiSignatureEngine:
         self,
         signer_type: SignerType,
         signer_key: str,
-        signed_data: Dict[str, Any]
+        signed_data: Dict[str, Any],
+        signed_data_hash: Optional[str] = None
     ) -> Signature:
         """
         Add a signature to the collection
@@ -140,6 +204,8 @@ class MultiSignatureEngine:
             signer_type: Type of signer
             signer_key: Signer's public key/identifier
             signed_data: Data being signed
+            signed_data_hash: Precomputed HashingEngine.hash_dict(signed_data),
+                for callers collecting several signatures over one payload
         
         Returns:
             Signature object
@@ -155,14 +221,17 @@ class MultiSignatureEngine:
             raise ValueError(f"Invalid key for signer type: {signer_type}")
         
         # Check for duplicate signature
-        if signer_type.value in self.signatures:
+        slot = self._INDEX[signer_type]
+        if self._slots[slot] is not None:
             raise ValueError(f"Signature already exists for {signer_type}")
         
         # Create signature
-        signature = Signature(signer_type, signer_key, signed_data)
-        signature.approve()  # Auto-approve when added
+        now = _utcnow_iso()
+        signature = Signature(signer_type, signer_key, signed_data, signed_data_hash, now=now)
+        signature.approve(now)  # Auto-approve when added
         
-        self.signatures[signer_type.value] = signature
+        self._slots[slot] = signature
+        self._collected += 1
         
         return signature
     
@@ -194,7 +263,7 @@ class MultiSignatureEngine:
             return False
         
         # Check if signature is approved
-        if signature.status != SignatureStatus.APPROVED:
+        if signature.status is not SignatureStatus.APPROVED:
             return False
         
         return True
@@ -206,21 +275,11 @@ class MultiSignatureEngine:
         Returns:
             True if fully signed, False otherwise
         """
-        # Check if we have required number of signatures
-        if len(self.signatures) < self.required_signatures:
-            return False
-        
-        # Check if all expected signers have signed
-        for signer_type in self.expected_signers:
-            if signer_type.value not in self.signatures:
-                return False
-            
-            # Check if signature is approved
-            sig = self.signatures[signer_type.value]
-            if sig.status != SignatureStatus.APPROVED:
-                return False
-        
-        return True
+        # Required count reached, every expected signer present, all approved
+        return (
+            self._collected >= self.required_signatures
+            and all(sig is not None and sig.status is SignatureStatus.APPROVED for sig in self._slots)
+        )
     
     def get_missing_signatures(self) -> List[str]:
         """
@@ -229,11 +288,7 @@ class MultiSignatureEngine:
         Returns:
             List of missing signer types
         """
-        missing = []
-        for signer_type in self.expected_signers:
-            if signer_type.value not in self.signatures:
-                missing.append(signer_type.value)
-        return missing
+        return [value for value, sig in zip(self._expected_signer_values, self._slots) if sig is None]
     
     def get_signature_status(self) -> Dict[str, Any]:
         """
@@ -244,7 +299,7 @@ class MultiSignatureEngine:
         """
         return {
             "total_required": self.required_signatures,
-            "collected": len(self.signatures),
+            "collected": self._collected,
             "missing": self.get_missing_signatures(),
             "is_complete": self.is_fully_signed(),
             "signatures": {
@@ -257,6 +312,14 @@ class MultiSignatureEngine:
         """
         Generate proof of multi-signature approval
         
+        The proof hash is SHA-256 over the signature hashes (hex strings,
+        sorted, joined with "|") followed directly by the proof timestamp:
+        
+            sha256(b"|".join(sorted(signature_hashes)) + timestamp)
+        
+        so a verifier can reproduce it from signature_hashes and
+        proof_data["timestamp"] alone.
+        
         Returns:
             Approval proof if fully signed, None otherwise
         """
@@ -266,17 +329,20 @@ class MultiSignatureEngine:
         # Collect all signature hashes
         signature_hashes = [
             sig.signature_hash
-            for sig in self.signatures.values()
+            for sig in self._slots
         ]
         
         # Generate combined proof
+        ts = _utcnow_iso()
         proof_data = {
-            "signatures": [sig.to_dict() for sig in self.signatures.values()],
-            "timestamp": datetime.utcnow().isoformat(),
+            "signatures": [sig.to_dict() for sig in self._slots],
+            "timestamp": ts,
             "verified": True
         }
         
-        proof_hash = HashingEngine.hash_dict(proof_data)
+        proof_hash = hashlib.sha256(
+            b"|".join(h.encode() for h in sorted(signature_hashes)) + ts.encode()
+        ).hexdigest()
         
         return {
             "proof_hash": proof_hash,
@@ -299,13 +365,22 @@ class MultiSignatureEngine:
             "rejected": True,
             "reason": reason,
             "missing_signatures": self.get_missing_signatures(),
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _utcnow_iso(),
             "status": "rejected"
         }
     
     def export_signatures(self) -> List[Dict[str, Any]]:
         """Export all signatures"""
-        return [sig.to_dict() for sig in self.signatures.values()]
+        return [sig.to_dict() for sig in self._slots if sig is not None]
+
+
+# Signer types every signature set must include, and the approved status value
+_REQUIRED_SIGNER_VALUES = (
+    SignerType.AI_VERIFIER.value,
+    SignerType.HUMAN_VERIFIER.value,
+    SignerType.ADMIN_CONTROLLER.value
+)
+_APPROVED = SignatureStatus.APPROVED.value
 
 
 class SignatureValidator:
@@ -331,22 +406,22 @@ class SignatureValidator:
         if len(signatures) < required_count:
             return False, f"Insufficient signatures: {len(signatures)}/{required_count}"
         
-        # Check for required signer types
-        signer_types = {sig.get("signer_type") for sig in signatures}
-        required_types = {
-            SignerType.AI_VERIFIER.value,
-            SignerType.HUMAN_VERIFIER.value,
-            SignerType.ADMIN_CONTROLLER.value
-        }
+        # One pass: collect signer types and the first unapproved signature
+        signer_types = set()
+        unapproved = None
+        for sig in signatures:
+            signer_types.add(sig.get("signer_type"))
+            if unapproved is None and sig.get("status") != _APPROVED:
+                unapproved = sig
         
-        missing_types = required_types - signer_types
+        # Check for required signer types
+        missing_types = [value for value in _REQUIRED_SIGNER_VALUES if value not in signer_types]
         if missing_types:
             return False, f"Missing signatures from: {', '.join(missing_types)}"
         
         # Check all signatures are approved
-        for sig in signatures:
-            if sig.get("status") != SignatureStatus.APPROVED.value:
-                return False, f"Signature from {sig.get('signer_type')} not approved"
+        if unapproved is not None:
+            return False, f"Signature from {unapproved.get('signer_type')} not approved"
         
         return True, None
     
@@ -1,8 +1,15 @@
 from typing import Dict, Any, Optional
+from collections import OrderedDict
 from datetime import datetime
+import hmac
 import secrets
+import threading
 from app.utils.hashing import HashingEngine
 
+# Hash inputs are joined as UTF-8 bytes with b":" separators, byte-for-byte
+# what the former f"{a}:{b}" strings encoded to, so old proofs still verify
+_SEP = b":"
+
 
 class ZKProof:
     """
@@ -51,8 +58,15 @@ class ZeroKnowledgeProofEngine:
     - Mock implementation for testing
     """
     
-    def __init__(self):
-        self.proofs: Dict[str, ZKProof] = {}
+    def __init__(self, max_proofs: int = 10000):
+        """
+        Args:
+            max_proofs: Most recently used proofs kept for get_proof
+        """
+        self.proofs: "OrderedDict[str, ZKProof]" = OrderedDict()
+        self.max_proofs = max_proofs
+        # Request threads share the engine; guards the LRU reordering
+        self._proofs_lock = threading.Lock()
     
     def generate_zkp(
         self,
@@ -77,17 +91,19 @@ class ZeroKnowledgeProofEngine:
         # Mock implementation using simple hashing
         # In production, use actual ZKP library
         
+        data_hash_bytes = data_hash.encode()
+        
         # Step 1: Generate commitment (hash of secret + random nonce)
         nonce = secrets.token_hex(32)
-        commitment_input = f"{data_hash}:{nonce}"
-        commitment = HashingEngine.hash_string(commitment_input)
+        commitment = HashingEngine.hash_bytes_concat(data_hash_bytes, _SEP, nonce.encode())
         
         # Step 2: Generate challenge (random value)
         challenge = secrets.token_hex(32)
         
         # Step 3: Generate response (in real ZKP, this proves knowledge without revealing)
-        response_input = f"{commitment}:{challenge}:{data_hash}"
-        response = HashingEngine.hash_string(response_input)
+        response = HashingEngine.hash_bytes_concat(
+            commitment.encode(), _SEP, challenge.encode(), _SEP, data_hash_bytes
+        )
         
         # Create proof
         proof = ZKProof(
@@ -97,8 +113,11 @@ class ZeroKnowledgeProofEngine:
             response=response
         )
         
-        # Store proof
-        self.proofs[proof.proof_id] = proof
+        # Store proof (least recently used proofs are dropped past max_proofs)
+        with self._proofs_lock:
+            self.proofs[proof.proof_id] = proof
+            if len(self.proofs) > self.max_proofs:
+                self.proofs.popitem(last=False)
         
         return proof
     
@@ -131,10 +150,12 @@ class ZeroKnowledgeProofEngine:
         
         # Verify response is correctly computed
         # (In real ZKP, this would verify cryptographic properties)
-        expected_response_input = f"{proof.commitment}:{proof.challenge}:{data_hash}"
-        expected_response = HashingEngine.hash_string(expected_response_input)
+        expected_response = HashingEngine.hash_bytes_concat(
+            proof.commitment.encode(), _SEP, proof.challenge.encode(), _SEP, data_hash.encode()
+        )
         
-        return proof.response == expected_response
+        # Constant-time compare; bytes, so a non-ASCII response is just a mismatch
+        return hmac.compare_digest(proof.response.encode(), expected_response.encode())
     
     def generate_integrity_proof(
         self,
@@ -154,8 +175,9 @@ class ZeroKnowledgeProofEngine:
             ZKProof proving integrity
         """
         # Combine all hashes
-        combined_data = f"{sheet_id}:{result_hash}:{blockchain_hash}"
-        combined_hash = HashingEngine.hash_string(combined_data)
+        combined_hash = HashingEngine.hash_bytes(
+            _SEP.join((sheet_id.encode(), result_hash.encode(), blockchain_hash.encode()))
+        )
         
         # Generate ZKP
         return self.generate_zkp(combined_hash)
@@ -180,15 +202,20 @@ class ZeroKnowledgeProofEngine:
             True if proof is valid
         """
         # Reconstruct combined hash
-        combined_data = f"{sheet_id}:{result_hash}:{blockchain_hash}"
-        combined_hash = HashingEngine.hash_string(combined_data)
+        combined_hash = HashingEngine.hash_bytes(
+            _SEP.join((sheet_id.encode(), result_hash.encode(), blockchain_hash.encode()))
+        )
         
         # Verify proof
         return self.verify_zkp(combined_hash, proof)
     
     def get_proof(self, proof_id: str) -> Optional[ZKProof]:
         """Get stored proof by ID"""
-        return self.proofs.get(proof_id)
+        with self._proofs_lock:
+            proof = self.proofs.get(proof_id)
+            if proof is not None:
+                self.proofs.move_to_end(proof_id)
+        return proof
     
     def export_proof(self, proof: ZKProof) -> Dict[str, Any]:
         """
@@ -228,11 +255,12 @@ class ZKPUtilities:
         Returns:
             Privacy proof
         """
-        engine = ZeroKnowledgeProofEngine()
+        engine = get_zkp_engine()
         
         # Create hash of result
-        result_data = f"{roll_number}:{marks}:{grade}"
-        result_hash = HashingEngine.hash_string(result_data)
+        result_hash = HashingEngine.hash_bytes(
+            _SEP.join((roll_number.encode(), str(marks).encode(), grade.encode()))
+        )
         
         # Generate ZKP
         proof = engine.generate_zkp(result_hash)
@@ -263,7 +291,7 @@ class ZKPUtilities:
         Returns:
             True if proof is valid
         """
-        engine = ZeroKnowledgeProofEngine()
+        engine = get_zkp_engine()
         
         # Reconstruct proof
         proof = ZKProof(
@@ -274,8 +302,9 @@ class ZKPUtilities:
         )
         
         # Create hash
-        result_data = f"{roll_number}:{marks}:{grade}"
-        result_hash = HashingEngine.hash_string(result_data)
+        result_hash = HashingEngine.hash_bytes(
+            _SEP.join((roll_number.encode(), str(marks).encode(), grade.encode()))
+        )
         
         # Verify
         return engine.verify_zkp(result_hash, proof)
@@ -295,13 +324,14 @@ class ZKPUtilities:
         Returns:
             Eligibility proof
         """
-        engine = ZeroKnowledgeProofEngine()
+        engine = get_zkp_engine()
         
         is_eligible = marks >= threshold
         
         # Create proof data
-        proof_data = f"eligible:{is_eligible}:threshold:{threshold}"
-        proof_hash = HashingEngine.hash_string(proof_data)
+        proof_hash = HashingEngine.hash_bytes(
+            _SEP.join((b"eligible", str(is_eligible).encode(), b"threshold", str(threshold).encode()))
+        )
         
         proof = engine.generate_zkp(proof_hash)
         
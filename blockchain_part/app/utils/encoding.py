@@ -0,0 +1,48 @@
+"""
+Base64 helpers for large image payloads
+"""
+
+import base64
+import binascii
+import hashlib
+from typing import Union
+
+try:
+    import pybase64 as _base64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    _base64 = base64
+    PYBASE64_AVAILABLE = False
+
+
+def b64decode(data: Union[str, bytes]) -> bytes:
+    """
+    Decode base64 data, using pybase64's SIMD decoder when installed.
+
+    Well-formed input takes the strict (fastest) path; anything else is
+    decoded leniently like base64.b64decode, which skips characters outside
+    the alphabet such as line breaks.
+    """
+    try:
+        return _base64.b64decode(data, validate=True)
+    except binascii.Error:
+        return base64.b64decode(data)
+
+
+def b64_sha256(data: Union[str, bytes], chunk_chars: int = 65536) -> str:
+    """
+    SHA-256 hex digest of the bytes encoded by base64 data.
+
+    Decodes and hashes in chunk_chars slices (a multiple of 4) so the full
+    decoded payload is never held in memory alongside the encoded one.
+    Input that is not strictly valid base64 is decoded in full with
+    b64decode, giving the same digest as hashing its result.
+    """
+    chunk_chars -= chunk_chars % 4
+    hasher = hashlib.sha256()
+    try:
+        for start in range(0, len(data), chunk_chars):
+            hasher.update(_base64.b64decode(data[start:start + chunk_chars], validate=True))
+    except binascii.Error:
+        return hashlib.sha256(b64decode(data)).hexdigest()
+    return hasher.hexdigest()
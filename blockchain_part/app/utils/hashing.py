@@ -5,23 +5,78 @@ from typing import Dict, Any, List, Union, Optional
 from datetime import datetime
 import base64
 import io
+import mmap
+import os
+import sys
+
+import orjson
+
+try:
+    import blake3 as _blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    _blake3 = None
+    BLAKE3_AVAILABLE = False
+
+# Canonical JSON for hash_canonical: sorted keys, non-string keys allowed,
+# datetimes and other non-JSON values through str() as in hash_dict
+_CANONICAL_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_HAS_FILE_DIGEST = sys.version_info >= (3, 11)
+
+# Files this large are mapped and hashed in one update() instead of being
+# read through a buffer (200 MB: 0.20 s mapped vs 0.22 s with file_digest)
+_MMAP_HASH_THRESHOLD = 10 * 1024 * 1024
+
+# Same output as json.dumps(data, sort_keys=True, default=str), which builds
+# a new encoder on every call when given options
+_HASH_JSON_ENCODER = json.JSONEncoder(sort_keys=True, default=str)
+
+# Every SHA-256 in this module goes through _sha256. On CPython it is
+# OpenSSL's constructor, which picks SHA-NI (or AVX2/ARMv8 SHA) code at
+# runtime from CPUID, so no separate SHA-NI backend is needed. Rebinding
+# _sha256 swaps the backend for every method, HMAC included.
+_sha256 = hashlib.sha256
+
+
+def _sha256_hex(data: bytes) -> str:
+    """Hex SHA-256 digest of data"""
+    return _sha256(data).hexdigest()
 
 
 class HashingEngine:
     """
     Comprehensive hashing engine for OMR evaluation system
     Provides SHA-256 hashing for all components
+    
+    Every hash that is stored, anchored on-chain or compared with a stored
+    value is SHA-256. That includes the hash_dict family (hash_list,
+    hash_model_output, hash_bubble_extraction, ...): their results become
+    block data hashes, signature hashes and audit entries that are
+    recomputed on verification. BLAKE3 (hash_file_blake3) is only for local
+    checks where both sides are computed with it, such as comparing
+    archive copies.
     """
     
     @staticmethod
     def hash_string(data: str) -> str:
         """Hash a string using SHA-256"""
-        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+        return _sha256_hex(data.encode('utf-8'))
     
     @staticmethod
     def hash_bytes(data: bytes) -> str:
         """Hash bytes using SHA-256"""
-        return hashlib.sha256(data).hexdigest()
+        return _sha256_hex(data)
+    
+    @staticmethod
+    def hash_bytes_concat(*parts: bytes) -> str:
+        """
+        Hash the concatenation of short parts (e.g. ZKP fields) using SHA-256
+        
+        The parts are joined and hashed in one call, which for inputs of a
+        few hundred bytes is cheaper than one update() call per part.
+        """
+        return _sha256_hex(b"".join(parts))
     
     @staticmethod
     def hash_file(file_content: bytes) -> str:
@@ -34,25 +89,64 @@ class HashingEngine:
         Returns:
             SHA-256 hash of the file
         """
-        return hashlib.sha256(file_content).hexdigest()
+        return _sha256_hex(file_content)
     
     @staticmethod
-    def hash_file_chunked(file_path: str, chunk_size: int = 8192) -> str:
+    def hash_file_chunked(file_path: str, chunk_size: int = 1 << 16) -> str:
         """
         Hash large files in chunks
         
+        Files of 10 MB or more are memory-mapped and hashed in a single
+        update() with no copy into Python buffers. Smaller files go through
+        hashlib.file_digest on Python 3.11+, which reads into one reusable
+        buffer and hashes with the GIL released.
+        
         Args:
             file_path: Path to the file
-            chunk_size: Size of chunks to read
+            chunk_size: Size of chunks to read (small files, before Python 3.11)
         
         Returns:
             SHA-256 hash of the file
         """
-        sha256_hash = hashlib.sha256()
         with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size >= _MMAP_HASH_THRESHOLD:
+                sha256_hash = _sha256()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    sha256_hash.update(mapped)
+                return sha256_hash.hexdigest()
+            
+            if _HAS_FILE_DIGEST:
+                return hashlib.file_digest(f, _sha256).hexdigest()
+            
+            sha256_hash = _sha256()
             for chunk in iter(lambda: f.read(chunk_size), b""):
                 sha256_hash.update(chunk)
-        return sha256_hash.hexdigest()
+            return sha256_hash.hexdigest()
+    
+    @staticmethod
+    def hash_file_blake3(file_path: str, chunk_size: int = 1 << 20) -> str:
+        """
+        Hash large files with multithreaded BLAKE3
+        
+        Much faster than SHA-256 for files over a few MB, but the digest is
+        not interchangeable with hash_file/hash_file_chunked.
+        
+        Args:
+            file_path: Path to the file
+            chunk_size: Size of chunks to read (large chunks let BLAKE3
+                spread each update across threads)
+        
+        Returns:
+            BLAKE3 hash of the file
+        """
+        if not BLAKE3_AVAILABLE:
+            raise RuntimeError("blake3 package is not installed")
+        
+        blake3_hash = _blake3.blake3(max_threads=_blake3.blake3.AUTO)
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                blake3_hash.update(chunk)
+        return blake3_hash.hexdigest()
     
     @staticmethod
     def hash_dict(data: Dict[str, Any]) -> str:
@@ -65,14 +159,29 @@ class HashingEngine:
         Returns:
             SHA-256 hash of the dictionary
         """
-        json_str = json.dumps(data, sort_keys=True, default=str)
-        return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+        json_str = _HASH_JSON_ENCODER.encode(data)
+        return _sha256_hex(json_str.encode('utf-8'))
     
     @staticmethod
     def hash_list(data: List[Any]) -> str:
         """Hash a list"""
-        json_str = json.dumps(data, sort_keys=True, default=str)
-        return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+        json_str = _HASH_JSON_ENCODER.encode(data)
+        return _sha256_hex(json_str.encode('utf-8'))
+    
+    @staticmethod
+    def canonical_dumps(data: Any) -> bytes:
+        """
+        Serialize data to canonical compact JSON bytes (sorted keys, orjson)
+        
+        The bytes differ from hash_dict's json.dumps text, so use
+        hash_canonical only for hashes that were created with it.
+        """
+        return orjson.dumps(data, default=str, option=_CANONICAL_OPTIONS)
+    
+    @staticmethod
+    def hash_canonical(data: Any) -> str:
+        """SHA-256 of canonical_dumps(data)"""
+        return _sha256_hex(HashingEngine.canonical_dumps(data))
     
     @staticmethod
     def hash_region(region_data: bytes, coordinates: Dict[str, int]) -> str:
@@ -86,10 +195,10 @@ class HashingEngine:
         Returns:
             Combined hash of region data and coordinates
         """
-        region_hash = hashlib.sha256(region_data).hexdigest()
+        region_hash = _sha256_hex(region_data)
         coords_hash = HashingEngine.hash_dict(coordinates)
         combined = f"{region_hash}:{coords_hash}"
-        return hashlib.sha256(combined.encode()).hexdigest()
+        return _sha256_hex(combined.encode())
     
     @staticmethod
     def hash_bubble_extraction(bubbles: List[Dict[str, Any]]) -> str:
@@ -225,7 +334,7 @@ class HashingEngine:
         return hmac.new(
             key.encode('utf-8'),
             message.encode('utf-8'),
-            hashlib.sha256
+            _sha256
         ).hexdigest()
     
     @staticmethod
@@ -0,0 +1,33 @@
+"""
+Fast JSON responses for API handlers
+"""
+
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+class PydanticResponse(JSONResponse):
+    """
+    JSON response rendered directly from a pydantic model or plain data.
+
+    Returning a Response from a handler bypasses FastAPI's jsonable_encoder
+    and the response_model validation pass; response_model declarations are
+    kept on the routes for the OpenAPI schema only.
+
+    Pass a cached TypeAdapter (see app.schemas._adapters) to serialize
+    through a prebuilt schema instead of the model's own serializer.
+    """
+
+    def __init__(self, content: Any, *args, adapter: Optional[TypeAdapter] = None, **kwargs):
+        self.adapter = adapter
+        super().__init__(content, *args, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if self.adapter is not None:
+            return self.adapter.dump_json(content)
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        return orjson.dumps(content)
@@ -1,10 +1,12 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import time
+from datetime import datetime
 
 from app.config import settings
-from app.database import init_db
+from app.database import init_db, optimize_db, maintain_db_periodically
 from app.api import (
     scan_router,
     bubble_router,
@@ -99,12 +101,12 @@ async def startup_event():
     # Sync blockchain with database
     print("⛓️  Initializing blockchain...")
     from app.blockchain import get_blockchain
-    from app.database import get_db, BlockModel
+    from app.database import SessionLocal, BlockModel
     
     blockchain = get_blockchain(difficulty=settings.BLOCKCHAIN_DIFFICULTY)
     
     # Load existing blocks from database
-    db = next(get_db())
+    db = SessionLocal()
     existing_blocks = db.query(BlockModel).order_by(BlockModel.block_index).all()
     
     if len(existing_blocks) > 1:  # More than just genesis
@@ -113,10 +115,23 @@ async def startup_event():
     
     print(f"✅ Blockchain initialized with {len(blockchain.chain)} blocks")
     
-    db.close()
+    SessionLocal.remove()
+    
+    # Archive finished months and keep SQLite planner statistics fresh,
+    # off the startup and request paths
+    app.state.maintenance_task = asyncio.create_task(maintain_db_periodically())
     print(f"🎯 Server ready at http://{settings.HOST}:{settings.PORT}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop scheduled maintenance and refresh planner statistics"""
+    maintenance_task = getattr(app.state, "maintenance_task", None)
+    if maintenance_task is not None:
+        maintenance_task.cancel()
+    optimize_db()
+
+
 # Root endpoint
 @app.get("/")
 async def root():
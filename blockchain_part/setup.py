@@ -0,0 +1,23 @@
+"""
+Optional ahead-of-time compilation of the pydantic schema modules
+
+Build the C extensions next to the sources (requires mypy):
+
+    pip install mypy
+    python setup.py build_ext --inplace
+
+The compiled modules shadow app/schemas/*.py on import; deleting the
+generated .so/.pyd files falls back to the pure-Python modules.
+"""
+
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="omr-blockchain-schemas",
+    packages=[],
+    ext_modules=mypycify([
+        "app/schemas/__init__.py",
+        "app/schemas/extended_schemas.py"
+    ])
+)
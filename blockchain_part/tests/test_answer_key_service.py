@@ -0,0 +1,26 @@
+"""
+Tests for AnswerKeyService verification
+"""
+
+import sys
+
+from app.services import answer_key_service
+from app.services.answer_key_service import AnswerKeyService
+
+
+ANSWERS = {
+    "Q1": {"answer": "A", "marks": 2},
+    "Q2": {"answer": "C", "marks": 1}
+}
+
+
+def test_verification_does_not_import_bedrock(monkeypatch):
+    monkeypatch.setattr(answer_key_service, "AI_EVALUATION_AVAILABLE", True)
+    
+    assert AnswerKeyService.validate_answer_key_format(ANSWERS, paper_id="P1") == (True, [])
+    verified, result = AnswerKeyService.verify_answer_key_with_ai("K1", ANSWERS, "P1")
+    AnswerKeyService.create_key_hash(ANSWERS)
+    
+    assert verified is True
+    assert result["verified_questions"] == 2
+    assert not any(name.startswith("ai_evaluation") for name in sys.modules)
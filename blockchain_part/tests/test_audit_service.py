@@ -0,0 +1,209 @@
+"""
+Tests for AuditLogger
+"""
+
+import os
+import shutil
+import threading
+
+import orjson
+
+from app.services.audit_service import AuditLogger
+
+
+def _logger(tmp_path):
+    # Long interval so the tests decide when entries are written
+    return AuditLogger(log_directory=str(tmp_path), flush_interval=60)
+
+
+def test_entries_round_trip_through_disk(tmp_path):
+    audit = _logger(tmp_path)
+    written = [
+        audit.append_log("S1", "scan", {"page": 1}),
+        audit.append_log("S1", "score", {"marks": 42.5, "tags": ["a", "b"]}, blockchain_hash="ab01"),
+        audit.append_log("S2", "scan", {"page": 1}, actor="operator")
+    ]
+    audit.flush()
+    
+    reopened = _logger(tmp_path)
+    logs = reopened.get_sheet_logs("S1")
+    
+    assert logs["entry_count"] == 2
+    assert logs["entries"] == written[:2]
+    assert reopened.get_sheet_logs("S2")["entries"] == written[2:]
+    assert reopened.get_sheet_logs("missing") is None
+    assert reopened.verify_log_integrity("S1") == (True, None)
+    
+    report = reopened.generate_audit_report("S1")
+    assert report["total_events"] == 2
+    assert report["event_types"] == {"scan": 1, "score": 1}
+    assert report["blockchain_hashes"] == ["ab01"]
+    assert report["integrity_verified"] is True
+
+
+def test_queued_entries_are_visible_before_flush(tmp_path):
+    audit = _logger(tmp_path)
+    audit.append_log("S1", "scan", {"page": 1})
+    audit.flush()
+    
+    entry = audit.append_log("S1", "verify", {"ok": True}, blockchain_hash="cd02")
+    
+    assert audit.get_sheet_logs("S1")["entries"][-1] == entry
+    assert audit.get_logs_by_type("S1", "verify") == [entry]
+    assert audit.get_logs_by_blockchain_hash("cd02") == [entry]
+    assert audit.generate_audit_report("S1")["total_events"] == 2
+
+
+def test_returned_logs_do_not_share_the_cache(tmp_path):
+    audit = _logger(tmp_path)
+    audit.append_log("S1", "scan", {"page": 1})
+    audit.flush()
+    
+    audit.get_sheet_logs("S1")["entries"].clear()
+    
+    assert audit.get_sheet_logs("S1")["entry_count"] == 1
+
+
+def test_tampered_entry_fails_verification(tmp_path):
+    audit = _logger(tmp_path)
+    audit.append_log("S1", "score", {"marks": 40})
+    audit.append_log("S1", "result", {"grade": "B"})
+    audit.flush()
+    assert audit.verify_log_integrity("S1") == (True, None)
+    
+    # Same size, and the mtime is put back: only the replay can catch it
+    log_file = tmp_path / "S1.jsonl"
+    mtime_ns = log_file.stat().st_mtime_ns
+    log_file.write_bytes(log_file.read_bytes().replace(b'"marks":40', b'"marks":90'))
+    os.utime(log_file, ns=(mtime_ns, mtime_ns))
+    
+    is_valid, error = audit.verify_log_integrity("S1")
+    assert not is_valid
+    assert error.startswith("Invalid hash for log entry")
+
+
+def test_truncated_log_fails_chain_check(tmp_path):
+    audit = _logger(tmp_path)
+    audit.append_log("S1", "scan", {"page": 1})
+    audit.append_log("S1", "score", {"marks": 40})
+    audit.flush()
+    
+    log_file = tmp_path / "S1.jsonl"
+    first_line = log_file.read_bytes().splitlines(keepends=True)[0]
+    log_file.write_bytes(first_line)
+    
+    assert _logger(tmp_path).verify_log_integrity("S1") == (False, "Hash chain mismatch for sheet S1")
+
+
+def test_hash_index_lookup_and_rebuild(tmp_path):
+    audit = _logger(tmp_path)
+    expected = []
+    for i in range(20):
+        blockchain_hash = f"ab{i % 4:02d}" if i % 5 else None
+        entry = audit.append_log(f"S{i % 3}", "event", {"i": i}, blockchain_hash=blockchain_hash)
+        if blockchain_hash == "ab01":
+            expected.append(entry)
+    audit.flush()
+    
+    assert audit.get_logs_by_blockchain_hash("ab01") == expected
+    assert audit.get_logs_by_blockchain_hash("zz99") == []
+    
+    # Entries flushed after the index was built are picked up on lookup
+    expected.append(audit.append_log("S9", "event", {"i": 99}, blockchain_hash="ab01"))
+    audit.flush()
+    assert audit.get_logs_by_blockchain_hash("ab01") == expected
+    
+    # A missing index is rebuilt from the master log
+    shutil.rmtree(tmp_path / "hash_index")
+    assert _logger(tmp_path).get_logs_by_blockchain_hash("ab01") == expected
+
+
+def test_stale_hash_index_is_rebuilt(tmp_path):
+    audit = _logger(tmp_path)
+    audit.append_log("S1", "event", {"i": 1}, blockchain_hash="ab01")
+    audit.append_log("S1", "event", {"i": 2}, blockchain_hash="cd02")
+    audit.flush()
+    assert len(audit.get_logs_by_blockchain_hash("ab01")) == 1
+    
+    # Replace the master log with one holding the entries in another order
+    master_log = tmp_path / "master_log.jsonl"
+    lines = master_log.read_bytes().splitlines(keepends=True)
+    master_log.write_bytes(b"".join(reversed(lines)))
+    
+    entries = audit.get_logs_by_blockchain_hash("ab01")
+    assert [entry["event_data"] for entry in entries] == [{"i": 1}]
+
+
+def test_legacy_json_logs_are_migrated(tmp_path):
+    creator = AuditLogger(log_directory=str(tmp_path / "unused"))
+    entries = [
+        creator.create_log_entry("S1", "scan", {"page": 1}),
+        creator.create_log_entry("S1", "score", {"marks": 40}, blockchain_hash="ab01")
+    ]
+    (tmp_path / "S1.json").write_bytes(orjson.dumps({
+        "sheet_id": "S1",
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "entries": entries
+    }))
+    (tmp_path / "master_log.json").write_bytes(orjson.dumps({"entries": entries}))
+    
+    audit = _logger(tmp_path)
+    logs = audit.get_sheet_logs("S1")
+    
+    assert logs["created_at"] == "2024-01-01T00:00:00+00:00"
+    assert logs["entries"] == entries
+    assert audit.verify_log_integrity("S1") == (True, None)
+    assert audit.get_logs_by_blockchain_hash("ab01") == entries[1:]
+    assert (tmp_path / "S1.json").exists()
+
+
+def test_concurrent_appends_reads_and_verification(tmp_path):
+    audit = AuditLogger(log_directory=str(tmp_path), flush_interval=0.01, max_pending=8)
+    writers, per_writer = 8, 50
+    errors = []
+    done = threading.Event()
+    
+    def write(n):
+        try:
+            for i in range(per_writer):
+                audit.append_log(f"S{i % 4}", "event", {"writer": n, "i": i}, blockchain_hash=f"w{n}")
+        except Exception as e:
+            errors.append(e)
+    
+    def read():
+        try:
+            while not done.is_set():
+                for sheet in ("S0", "S1", "S2", "S3"):
+                    if os.path.exists(tmp_path / f"{sheet}.jsonl"):
+                        is_valid, error = audit.verify_log_integrity(sheet)
+                        assert is_valid, error
+                    audit.get_sheet_timeline(sheet)
+                audit.get_logs_by_blockchain_hash("w0")
+        except Exception as e:
+            errors.append(e)
+    
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+    for thread in readers + threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+    audit.flush()
+    
+    assert errors == []
+    
+    reopened = _logger(tmp_path)
+    total = 0
+    for sheet in ("S0", "S1", "S2", "S3"):
+        entries = reopened.get_sheet_logs(sheet)["entries"]
+        assert len({entry["log_id"] for entry in entries}) == len(entries)
+        assert reopened.verify_log_integrity(sheet) == (True, None)
+        total += len(entries)
+    assert total == writers * per_writer
+    
+    for n in range(writers):
+        entries = reopened.get_logs_by_blockchain_hash(f"w{n}")
+        assert sorted(entry["event_data"]["i"] for entry in entries) == list(range(per_writer))
@@ -0,0 +1,53 @@
+"""
+Tests for OMREvaluatorService.evaluate_from_base64
+"""
+
+import base64
+
+from app.services.omr_evaluator_service import OMREvaluatorService
+
+
+# 1x1 transparent PNG
+PNG_BYTES = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+
+def _capture_image(monkeypatch):
+    service = OMREvaluatorService()
+    received = {}
+    
+    def fake_evaluate_sheet(image_data, answer_key=None, num_questions=50, sheet_id=None):
+        received["image_data"] = image_data
+        return {"success": True, "sheet_id": sheet_id}
+    
+    monkeypatch.setattr(service, "evaluate_sheet", fake_evaluate_sheet)
+    return service, received
+
+
+def test_evaluate_from_base64_decodes_payload(monkeypatch):
+    service, received = _capture_image(monkeypatch)
+    
+    result = service.evaluate_from_base64(base64.b64encode(PNG_BYTES).decode(), sheet_id="S1")
+    
+    assert result == {"success": True, "sheet_id": "S1"}
+    assert received["image_data"] == PNG_BYTES
+
+
+def test_evaluate_from_base64_strips_data_url_prefix(monkeypatch):
+    service, received = _capture_image(monkeypatch)
+    payload = "data:image/png;base64," + base64.b64encode(PNG_BYTES).decode()
+    
+    result = service.evaluate_from_base64(payload)
+    
+    assert result["success"] is True
+    assert received["image_data"] == PNG_BYTES
+
+
+def test_evaluate_from_base64_accepts_line_wrapped_payload(monkeypatch):
+    service, received = _capture_image(monkeypatch)
+    encoded = base64.encodebytes(PNG_BYTES * 20).decode()
+    
+    service.evaluate_from_base64(encoded)
+    
+    assert received["image_data"] == PNG_BYTES * 20
@@ -0,0 +1,122 @@
+"""
+Tests for monthly partition archiving and the shard list cache
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.database import partitions
+from app.database.partitions import (
+    archive_partitions,
+    archive_previous_months,
+    list_partitions,
+    select_partitioned
+)
+
+
+metadata = MetaData()
+events = Table(
+    "test_events",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("sheet_id", String),
+    Column("timestamp", DateTime)
+)
+EventModel = SimpleNamespace(__table__=events)
+
+TIMES = [
+    datetime(2024, 1, 5),
+    datetime(2024, 1, 20),
+    datetime(2024, 2, 10),
+    datetime(2024, 3, 1, 12)
+]
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(partitions, "_partition_names", {})
+    engine = create_engine(f"sqlite:///{tmp_path / 'partitions.db'}")
+    metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(insert(events), [
+            {"id": i, "sheet_id": f"S{i % 2}", "timestamp": ts}
+            for i, ts in enumerate(TIMES)
+        ])
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def _rows(db, newest_first=True, **filters):
+    query = select_partitioned(db, EventModel, newest_first=newest_first, **filters)
+    return [(row.id, row.timestamp) for row in db.execute(query)]
+
+
+def test_archive_moves_rows_into_monthly_shards(db):
+    before = _rows(db)
+    
+    moved = archive_partitions(db, EventModel, datetime(2024, 3, 1))
+    
+    assert moved == 3
+    assert [table.name for table in list_partitions(db, events)] == ["test_events_2024_02", "test_events_2024_01"]
+    assert db.execute(events.select()).all() == [(3, "S1", TIMES[3])]
+    assert _rows(db) == before
+    assert _rows(db, sheet_id="S0") == [(2, TIMES[2]), (0, TIMES[0])]
+
+
+def test_archive_refreshes_the_cached_shard_list(db):
+    assert list_partitions(db, events) == []
+    
+    archive_partitions(db, EventModel, datetime(2024, 2, 1))
+    assert [table.name for table in list_partitions(db, events)] == ["test_events_2024_01"]
+    
+    archive_partitions(db, EventModel, datetime(2024, 3, 1))
+    assert [table.name for table in list_partitions(db, events)] == ["test_events_2024_02", "test_events_2024_01"]
+    assert len(_rows(db)) == len(TIMES)
+
+
+def test_shard_list_cache_expires(db, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(partitions.time, "monotonic", lambda: now[0])
+    assert list_partitions(db, events) == []
+    
+    # A shard created behind the cache's back (e.g. by another process)
+    partitions._define_partition(events, "test_events_2023_12").create(bind=db.connection())
+    db.commit()
+    assert list_partitions(db, events) == []
+    
+    now[0] += partitions._PARTITION_CACHE_TTL
+    assert [table.name for table in list_partitions(db, events)] == ["test_events_2023_12"]
+
+
+def test_rows_in_the_same_second_keep_insertion_order(db):
+    db.execute(insert(events), [
+        {"id": 10, "sheet_id": "S2", "timestamp": TIMES[1]},
+        {"id": 11, "sheet_id": "S2", "timestamp": TIMES[1]}
+    ])
+    db.commit()
+    archive_partitions(db, EventModel, datetime(2024, 3, 1))
+    
+    assert _rows(db, sheet_id="S2") == [(11, TIMES[1]), (10, TIMES[1])]
+    assert _rows(db, newest_first=False, sheet_id="S2") == [(10, TIMES[1]), (11, TIMES[1])]
+    assert [row_id for row_id, _ in _rows(db, newest_first=False)] == [0, 1, 10, 11, 2, 3]
+
+
+def test_previous_months_are_archived_once_per_month(db, monkeypatch):
+    monkeypatch.setattr(partitions, "_archived_before", {})
+    calls = []
+    
+    def fake_archive(db, model, before):
+        calls.append(before)
+        return 2
+    
+    monkeypatch.setattr(partitions, "archive_partitions", fake_archive)
+    
+    assert archive_previous_months(db, [EventModel]) == 2
+    assert archive_previous_months(db, [EventModel]) == 0
+    assert len(calls) == 1
+    assert calls[0] == calls[0].replace(day=1, hour=0, minute=0, second=0, microsecond=0)
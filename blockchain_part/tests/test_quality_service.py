@@ -0,0 +1,147 @@
+"""
+Tests for QualityAssessmentService scoring and its result cache
+"""
+
+import asyncio
+import sys
+from collections import OrderedDict
+
+import pytest
+
+from app.services import quality_service
+from app.services.quality_service import QualityAssessmentService
+
+
+MERGED_DAMAGES = {
+    "total_count": 2,
+    "severe_count": 1,
+    "overall_quality_score": 0.65,
+    "is_recoverable": True,
+    "damage_types": ["fold"],
+    "damages": [{"type": "fold", "bbox": [1, 2, 3, 4]}]
+}
+
+
+class FakeSmartSheetService:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(quality_service, "SMART_SHEET_AVAILABLE", True)
+    monkeypatch.setattr(quality_service, "_smart_sheet_classes", (FakeSmartSheetService, FakeSmartSheetService))
+    monkeypatch.setattr(quality_service, "_ASSESSMENT_CACHE", OrderedDict())
+    service = QualityAssessmentService()
+    calls = []
+    
+    def fake_detect(image_bytes):
+        calls.append(image_bytes)
+        return MERGED_DAMAGES
+    
+    monkeypatch.setattr(service, "_detect_merged_damages", fake_detect)
+    return service, calls
+
+
+def test_assess_quality_scores_damage(service):
+    service, _ = service
+    
+    approved, data = service.assess_quality(b"sheet")
+    
+    assert approved is False
+    assert data["damage_severity"] == "low"
+    assert data["requires_reconstruction"] is True
+    assert data["requires_human_intervention"] is False
+    assert data["flagged_for_review"] is False
+    assert data["flag_reason"] is None
+
+
+def test_assess_quality_reuses_cached_result(service):
+    service, calls = service
+    
+    first = service.assess_quality(b"sheet")
+    second = service.assess_quality(b"sheet")
+    service.assess_quality(b"other sheet")
+    
+    assert first == second
+    assert calls == [b"sheet", b"other sheet"]
+
+
+def test_cached_result_is_not_shared_with_callers(service):
+    service, _ = service
+    
+    _, first = service.assess_quality(b"sheet")
+    first["damage_regions"][0]["bbox"].append(99)
+    first["damage_types"].clear()
+    
+    _, second = service.assess_quality(b"sheet")
+    
+    assert second["damage_regions"] == [{"type": "fold", "bbox": [1, 2, 3, 4]}]
+    assert second["damage_types"] == ["fold"]
+
+
+def test_failed_assessment_is_not_cached(service, monkeypatch):
+    service, _ = service
+    
+    def failing_detect(image_bytes):
+        raise RuntimeError("throttled")
+    
+    monkeypatch.setattr(service, "_detect_merged_damages", failing_detect)
+    approved, data = service.assess_quality(b"sheet")
+    
+    assert approved is False
+    assert data["flag_reason"] == "Quality assessment error: throttled"
+    assert len(quality_service._ASSESSMENT_CACHE) == 0
+
+
+def test_result_cache_is_bounded(service, monkeypatch):
+    service, calls = service
+    monkeypatch.setattr(quality_service, "_RESULT_CACHE_SIZE", 2)
+    
+    for image in (b"a", b"b", b"a", b"c", b"a", b"b"):
+        service.assess_quality(image)
+    
+    assert calls == [b"a", b"b", b"c", b"b"]
+
+
+def test_batch_assesses_each_distinct_image_once(service):
+    service, calls = service
+    service.assess_quality(b"cached")
+    
+    results = asyncio.run(service.assess_quality_batch([b"a", b"cached", b"a", b"b"]))
+    
+    assert sorted(calls) == [b"a", b"b", b"cached"]
+    assert results == [service.assess_quality(image) for image in (b"a", b"cached", b"a", b"b")]
+    assert results[0][1] is not results[2][1]
+    assert results[0][1]["damage_regions"] is not results[2][1]["damage_regions"]
+
+
+def test_batch_flags_only_the_failing_image(service, monkeypatch):
+    service, _ = service
+    
+    def detect(image_bytes):
+        if image_bytes == b"bad":
+            raise RuntimeError("throttled")
+        return MERGED_DAMAGES
+    
+    monkeypatch.setattr(service, "_detect_merged_damages", detect)
+    results = asyncio.run(service.assess_quality_batch([b"good", b"bad"]))
+    
+    assert results[0][1]["flag_reason"] is None
+    assert results[1][0] is False
+    assert results[1][1]["flag_reason"] == "Quality assessment error: throttled"
+
+
+def test_failed_smart_sheet_import_falls_back_to_default(monkeypatch):
+    monkeypatch.setattr(quality_service, "SMART_SHEET_AVAILABLE", True)
+    monkeypatch.setattr(quality_service, "_smart_sheet_classes", None)
+    monkeypatch.setitem(sys.modules, "smart_sheet_recovery.services.damage_detection", None)
+    service = QualityAssessmentService()
+    
+    approved, data = service.assess_quality(b"sheet")
+    
+    assert approved is True
+    assert data == dict(quality_service._DEFAULT_ASSESSMENT)
+    assert quality_service.SMART_SHEET_AVAILABLE is False
+    assert service.damage_service is None
+    assert service.reconstruct_sheet(b"sheet")[0] is False
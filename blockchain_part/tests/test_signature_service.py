@@ -0,0 +1,47 @@
+"""
+Tests for MultiSignatureEngine signed-data hashing
+"""
+
+from app.config import settings
+from app.services import signature_service
+from app.services.signature_service import MultiSignatureEngine, SignerType
+from app.utils.hashing import HashingEngine
+
+
+SIGNERS = [
+    (SignerType.AI_VERIFIER, settings.AI_VERIFIER_KEY),
+    (SignerType.HUMAN_VERIFIER, settings.HUMAN_VERIFIER_KEY),
+    (SignerType.ADMIN_CONTROLLER, settings.ADMIN_CONTROLLER_KEY)
+]
+
+
+def test_precomputed_hash_is_shared_by_all_signers(monkeypatch):
+    data = {"sheet_id": "S1", "marks": 42}
+    data_hash = HashingEngine.hash_dict(data)
+    hash_dict = HashingEngine.hash_dict
+    calls = []
+    
+    def counting_hash(value):
+        calls.append(value)
+        return hash_dict(value)
+    
+    monkeypatch.setattr(signature_service.HashingEngine, "hash_dict", staticmethod(counting_hash))
+    engine = MultiSignatureEngine()
+    for signer_type, key in SIGNERS:
+        engine.add_signature(signer_type, key, data, signed_data_hash=data_hash)
+    
+    assert calls == []
+    assert engine.is_fully_signed()
+    assert {sig.signed_data_hash for sig in engine.signatures.values()} == {data_hash}
+
+
+def test_each_signature_hashes_the_data_it_was_given():
+    data = {"sheet_id": "S1", "marks": 42}
+    engine = MultiSignatureEngine()
+    
+    first = engine.add_signature(*SIGNERS[0], data)
+    data["marks"] = 90
+    second = engine.add_signature(*SIGNERS[1], data)
+    
+    assert first.signed_data_hash == HashingEngine.hash_dict({"sheet_id": "S1", "marks": 42})
+    assert second.signed_data_hash == HashingEngine.hash_dict(data)
@@ -0,0 +1,179 @@
+"""
+Tests for S3StorageService uploads and the presigned URL cache
+"""
+
+import hashlib
+import io
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import storage_service
+from app.services.storage_service import S3StorageService
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+    
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        with self._lock:
+            self.calls += 1
+            return f"https://s3.test/{Params['Key']}?expires={ExpiresIn}&n={self.calls}"
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(S3StorageService, "_LOCAL_STORAGE_DIR", str(tmp_path))
+    monkeypatch.setattr(S3StorageService, "_local_dir_ready", False)
+    service = S3StorageService()
+    service.s3_client = None
+    return service, tmp_path
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(storage_service.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def service():
+    service = S3StorageService()
+    service.s3_client = FakeS3Client()
+    return service
+
+
+def test_presigned_url_is_reused_while_mostly_unexpired(service, clock):
+    url = service.generate_presigned_url("sheets/a.png", expiration=1000)
+    
+    clock[0] += 100
+    assert service.generate_presigned_url("sheets/a.png", expiration=1000) == url
+    assert service.s3_client.calls == 1
+    
+    # Less than 90% of the lifetime left: sign a new URL
+    clock[0] += 1
+    assert service.generate_presigned_url("sheets/a.png", expiration=1000) != url
+    assert service.s3_client.calls == 2
+
+
+def test_presigned_url_cache_is_keyed_by_expiration(service, clock):
+    short = service.generate_presigned_url("sheets/a.png", expiration=60)
+    long = service.generate_presigned_url("sheets/a.png", expiration=3600)
+    
+    assert short != long
+    assert service.generate_presigned_url("sheets/a.png", expiration=60) == short
+    assert service.s3_client.calls == 2
+
+
+def test_zero_expiration_is_not_cached(service, clock):
+    service.generate_presigned_url("sheets/a.png", expiration=0)
+    service.generate_presigned_url("sheets/a.png", expiration=0)
+    
+    assert service.s3_client.calls == 2
+
+
+def test_presigned_url_cache_is_bounded(service, clock, monkeypatch):
+    monkeypatch.setattr(storage_service, "_URL_CACHE_SIZE", 2)
+    
+    first = service.generate_presigned_url("a", expiration=3600)
+    service.generate_presigned_url("b", expiration=3600)
+    service.generate_presigned_url("a", expiration=3600)
+    service.generate_presigned_url("c", expiration=3600)
+    
+    # "b" was least recently used and evicted; "a" survived
+    assert service.generate_presigned_url("a", expiration=3600) == first
+    assert service.s3_client.calls == 3
+    service.generate_presigned_url("b", expiration=3600)
+    assert service.s3_client.calls == 4
+
+
+def test_presigned_url_cache_under_concurrent_requests(service, monkeypatch):
+    monkeypatch.setattr(storage_service, "_URL_CACHE_SIZE", 8)
+    errors = []
+    
+    def request(n):
+        try:
+            for i in range(200):
+                key = f"sheets/{(n + i) % 16}.png"
+                assert key in service.generate_presigned_url(key, expiration=3600)
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=request, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert len(service._url_cache) <= 8
+
+
+def test_stream_is_hashed_while_copied_to_local_storage(local_storage):
+    service, storage_dir = local_storage
+    data = bytes(range(256)) * 9000
+    file_hash = hashlib.sha256(data).hexdigest()
+    
+    result = service.upload_stream(io.BytesIO(data), "S1.jpg", metadata={"sheet_id": "S1"}, expected_hash=file_hash)
+    
+    assert result["file_hash"] == file_hash
+    assert open(result["local_path"], "rb").read() == data
+    assert sorted(path.name for path in storage_dir.iterdir()) == [
+        os.path.basename(result["local_path"]),
+        os.path.basename(result["local_path"]) + ".meta.json"
+    ]
+
+
+def test_stream_with_wrong_hash_is_not_stored(local_storage):
+    service, storage_dir = local_storage
+    
+    with pytest.raises(ValueError):
+        service.upload_stream(io.BytesIO(b"sheet"), "S1.jpg", expected_hash="0" * 64)
+    
+    assert list(storage_dir.iterdir()) == []
+
+
+def test_stream_is_hashed_before_s3_upload(service):
+    uploaded = {}
+    
+    def upload_fileobj(file_obj, bucket, key, ExtraArgs, Config):
+        uploaded["key"] = key
+        uploaded["body"] = file_obj.read()
+    
+    service.s3_client.upload_fileobj = upload_fileobj
+    data = b"header" + b"sheet" * 1000
+    file_obj = io.BytesIO(data)
+    file_obj.read(6)
+    file_hash = hashlib.sha256(data[6:]).hexdigest()
+    
+    result = service.upload_stream(file_obj, "S1.jpg", expected_hash=file_hash)
+    
+    assert result["file_hash"] == file_hash
+    assert uploaded["key"].endswith(f"{file_hash}_S1.jpg")
+    assert uploaded["body"] == data[6:]
+
+
+def test_upload_many_keeps_input_order_and_reports_failures(local_storage, monkeypatch):
+    service, _ = local_storage
+    # A tiny multipart threshold exercises the worker cap for large files
+    monkeypatch.setattr(S3StorageService, "_transfer_config", SimpleNamespace(multipart_threshold=4, max_concurrency=8))
+    
+    def upload_file(file_content, file_name, content_type=None, metadata=None):
+        if file_name == "bad.jpg":
+            raise OSError("disk full")
+        return {"success": True, "file_name": file_name}
+    
+    monkeypatch.setattr(service, "upload_file", upload_file)
+    files = [{"file_content": b"x" * i, "file_name": f"{i}.jpg"} for i in range(10)]
+    files.insert(3, {"file_content": b"", "file_name": "bad.jpg"})
+    
+    results = service.upload_many(files)
+    
+    assert [result["file_name"] for result in results] == [f["file_name"] for f in files]
+    assert results[3] == {"success": False, "error": "disk full", "file_name": "bad.jpg"}
+    assert service.upload_many([]) == []
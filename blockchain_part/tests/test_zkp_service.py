@@ -0,0 +1,60 @@
+"""
+Tests for ZeroKnowledgeProofEngine proofs and its proof store
+"""
+
+import threading
+
+from app.services.zkp_service import ZeroKnowledgeProofEngine, ZKPUtilities
+
+
+def test_integrity_proof_round_trip():
+    engine = ZeroKnowledgeProofEngine()
+    
+    proof = engine.generate_integrity_proof("S1", "result-hash", "block-hash")
+    
+    assert engine.verify_integrity_proof("S1", "result-hash", "block-hash", proof)
+    assert not engine.verify_integrity_proof("S1", "result-hash", "other-block", proof)
+
+
+def test_result_privacy_proof_round_trip():
+    proof = ZKPUtilities.generate_result_privacy_proof("R100", 88.5, "A")["proof"]
+    
+    assert ZKPUtilities.verify_result_privacy_proof("R100", 88.5, "A", proof)
+    assert not ZKPUtilities.verify_result_privacy_proof("R100", 98.5, "A", proof)
+
+
+def test_proof_store_drops_least_recently_used():
+    engine = ZeroKnowledgeProofEngine(max_proofs=2)
+    
+    first = engine.generate_zkp("h1")
+    second = engine.generate_zkp("h2")
+    assert engine.get_proof(first.proof_id) is first
+    
+    third = engine.generate_zkp("h3")
+    
+    assert engine.get_proof(second.proof_id) is None
+    assert engine.get_proof(first.proof_id) is first
+    assert engine.get_proof(third.proof_id) is third
+
+
+def test_proof_store_under_concurrent_requests():
+    engine = ZeroKnowledgeProofEngine(max_proofs=16)
+    errors = []
+    
+    def request(n):
+        try:
+            for i in range(300):
+                proof = engine.generate_zkp(f"hash-{n}-{i}")
+                engine.get_proof(proof.proof_id)
+                assert engine.verify_zkp(f"hash-{n}-{i}", proof)
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=request, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert len(engine.proofs) == 16
@@ -34,6 +34,10 @@ from PIL import Image
 GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
 
+# One HTTP session for all passes and sheets, so the TLS connection to the
+# API is kept alive instead of re-established for every request
+_session = requests.Session()
+
 # Three different prompts for varied detection
 PROMPTS = [
     # Prompt 1: Standard
@@ -90,7 +94,7 @@ def get_api_key():
     return key
 
 def image_to_base64(image_path):
-    """Convert image to base64."""
+    """Convert image (path or binary file object) to base64."""
     with Image.open(image_path) as img:
         if img.mode in ('RGBA', 'LA', 'P'):
             img = img.convert('RGB')
@@ -131,7 +135,7 @@ def detect_single_pass(image_data, api_key, prompt, pass_num):
     }
     
     try:
-        response = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=60)
+        response = _session.post(GROQ_API_URL, headers=headers, json=payload, timeout=60)
         
         if response.status_code != 200:
             return None
@@ -192,8 +196,12 @@ def detect_single_pass(image_data, api_key, prompt, pass_num):
 def detect_with_voting(image_path, num_questions=10):
     """
     Run 3 detection passes and use majority voting.
+    
+    image_path may also be a binary file object (e.g. io.BytesIO) so
+    callers holding image bytes don't need a temp file.
     """
-    print(f"\nAnalyzing: {Path(image_path).name}")
+    name = Path(image_path).name if isinstance(image_path, (str, Path)) else "in-memory image"
+    print(f"\nAnalyzing: {name}")
     print("Running 3-pass validation...")
     
     api_key = get_api_key()
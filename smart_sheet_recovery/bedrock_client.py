@@ -10,7 +10,7 @@ from typing import Dict, Any, Optional
 import os
 import time
 from botocore.config import Config
-from botocore.exceptions import ClientError
+from botocore.exceptions import ClientError, ParamValidationError
 
 
 class BedrockVisionClient:
@@ -23,11 +23,16 @@ class BedrockVisionClient:
     NOVA_PRO = "us.amazon.nova-pro-v1:0"
     LLAMA_31_VISION = "us.meta.llama3-2-90b-instruct-v1:0"
     
+    # Model IDs that rejected latency-optimized inference; they stay on
+    # "standard" for the rest of the process
+    _optimized_unavailable = set()
+    
     def __init__(
         self, 
         model_id: str = CLAUDE_35_SONNET,
         region: str = "us-east-1",
-        max_tokens: int = 4096
+        max_tokens: int = 4096,
+        performance_config: str = "standard"
     ):
         """
         Initialize Bedrock client
@@ -36,9 +41,11 @@ class BedrockVisionClient:
             model_id: AWS Bedrock model ID (default: Claude 3.5 Sonnet)
             region: AWS region
             max_tokens: Maximum tokens for response
+            performance_config: Bedrock latency mode ("standard" or "optimized")
         """
         self.model_id = model_id
         self.max_tokens = max_tokens
+        self.performance_config = self.resolve_performance_config(model_id, performance_config)
         
         # Configure client with retries
         config = Config(
@@ -104,6 +111,51 @@ class BedrockVisionClient:
                     # Re-raise if not throttling or max retries reached
                     raise
     
+    @classmethod
+    def resolve_performance_config(cls, model_id: str, performance_config: str) -> str:
+        """Requested latency mode, or standard if the model already rejected optimized"""
+        if performance_config == "optimized" and model_id in cls._optimized_unavailable:
+            return "standard"
+        return performance_config
+    
+    @staticmethod
+    def _latency_setting_rejected(error: Exception) -> bool:
+        """
+        True if the request failed because of performanceConfigLatency itself:
+        a model or region without latency-optimized inference, or a botocore
+        release that predates the parameter. Any other validation error
+        (bad body, too many tokens, ...) is not a reason to downgrade.
+        """
+        if isinstance(error, ClientError):
+            details = error.response.get('Error', {})
+            if details.get('Code', '') != 'ValidationException':
+                return False
+            message = details.get('Message', '')
+        else:
+            message = str(error)
+        
+        message = message.lower()
+        return "latency" in message or "performanceconfig" in message
+    
+    def _invoke_model(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request body to the model and decode the JSON response"""
+        
+        params = {"modelId": self.model_id, "body": json.dumps(body)}
+        
+        if self.performance_config == "optimized":
+            try:
+                response = self.client.invoke_model(performanceConfigLatency="optimized", **params)
+                return json.loads(response['body'].read())
+            except (ClientError, ParamValidationError) as e:
+                if not self._latency_setting_rejected(e):
+                    raise
+                print(f"Warning: latency-optimized inference not available for {self.model_id}, using standard")
+                self._optimized_unavailable.add(self.model_id)
+                self.performance_config = "standard"
+        
+        response = self.client.invoke_model(**params)
+        return json.loads(response['body'].read())
+    
     def _invoke_claude(
         self, 
         prompt: str, 
@@ -140,12 +192,7 @@ class BedrockVisionClient:
             ]
         }
         
-        response = self.client.invoke_model(
-            modelId=self.model_id,
-            body=json.dumps(body)
-        )
-        
-        result = json.loads(response['body'].read())
+        result = self._invoke_model(body)
         
         return {
             "success": True,
@@ -190,12 +237,7 @@ class BedrockVisionClient:
             }
         }
         
-        response = self.client.invoke_model(
-            modelId=self.model_id,
-            body=json.dumps(body)
-        )
-        
-        result = json.loads(response['body'].read())
+        result = self._invoke_model(body)
         
         return {
             "success": True,
@@ -221,12 +263,7 @@ class BedrockVisionClient:
             "top_p": top_p
         }
         
-        response = self.client.invoke_model(
-            modelId=self.model_id,
-            body=json.dumps(body)
-        )
-        
-        result = json.loads(response['body'].read())
+        result = self._invoke_model(body)
         
         return {
             "success": True,
@@ -243,17 +280,25 @@ class BedrockVisionClient:
 # Singleton instance
 _bedrock_client = None
 
-def get_bedrock_client(model_id: str = BedrockVisionClient.CLAUDE_35_SONNET) -> BedrockVisionClient:
+def get_bedrock_client(
+    model_id: str = BedrockVisionClient.CLAUDE_35_SONNET,
+    performance_config: str = "standard"
+) -> BedrockVisionClient:
     """
     Get or create Bedrock client singleton
     
     Args:
         model_id: Model to use (default: Claude 3.5 Sonnet)
+        performance_config: Bedrock latency mode ("standard" or "optimized")
         
     Returns:
         BedrockVisionClient instance
     """
     global _bedrock_client
     if _bedrock_client is None or _bedrock_client.model_id != model_id:
-        _bedrock_client = BedrockVisionClient(model_id=model_id)
+        _bedrock_client = BedrockVisionClient(model_id=model_id, performance_config=performance_config)
+    else:
+        _bedrock_client.performance_config = BedrockVisionClient.resolve_performance_config(
+            model_id, performance_config
+        )
     return _bedrock_client
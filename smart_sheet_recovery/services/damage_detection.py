@@ -73,14 +73,19 @@ Return JSON:
 class DamageDetectionService:
     """Service for detecting and classifying damage on OMR sheets"""
     
-    def __init__(self, model_id: str = BedrockVisionClient.CLAUDE_35_SONNET):
+    def __init__(
+        self,
+        model_id: str = BedrockVisionClient.CLAUDE_35_SONNET,
+        performance_config: str = "standard"
+    ):
         """
         Initialize damage detection service
         
         Args:
             model_id: Bedrock model to use
+            performance_config: Bedrock latency mode ("standard" or "optimized")
         """
-        self.bedrock_client = get_bedrock_client(model_id)
+        self.bedrock_client = get_bedrock_client(model_id, performance_config)
         self.cv_utils = CVUtils()
     
     def detect_damage(self, image_bytes: bytes) -> Dict[str, Any]:
@@ -116,14 +116,19 @@ For each damage, provide:
 class ReconstructionService:
     """Service for OMR sheet reconstruction using AWS Bedrock"""
     
-    def __init__(self, model_id: str = BedrockVisionClient.CLAUDE_35_SONNET):
+    def __init__(
+        self,
+        model_id: str = BedrockVisionClient.CLAUDE_35_SONNET,
+        performance_config: str = "standard"
+    ):
         """
         Initialize reconstruction service
         
         Args:
             model_id: Bedrock model to use
+            performance_config: Bedrock latency mode ("standard" or "optimized")
         """
-        self.bedrock_client = get_bedrock_client(model_id)
+        self.bedrock_client = get_bedrock_client(model_id, performance_config)
         self.cv_utils = CVUtils()
     
     def preprocess_sheet(self, image: np.ndarray) -> Tuple[np.ndarray, Dict[str, Any]]: